@@ -21,23 +21,33 @@ class FileStorage:
 
     __file_path = "file.json"
     __objects = {}
+    __by_class = {}
+    __indexed = None
+
+    def __index(self):
+        """Return __by_class, rebuilt if __objects was replaced"""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__by_class = {}
+            for k, v in FileStorage.__objects.items():
+                FileStorage.__by_class.setdefault(
+                    v.__class__.__name__, {})[k] = v
+            FileStorage.__indexed = FileStorage.__objects
+        return FileStorage.__by_class
 
     def all(self, cls=None):
         """Return the dictionary __objects"""
         if not cls:
             return self.__objects
-        elif type(cls) == str:
-            return {k: v for k, v in self.__objects.items()
-                    if v.__class__.__name__ == cls}
-        else:
-            return {k: v for k, v in self.__objects.items()
-                    if v.__class__ == cls}
+        if type(cls) != str:
+            cls = cls.__name__
+        return dict(self.__index().get(cls, {}))
 
     def new(self, obj):
         """Sets  __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
             self.__objects[key] = obj
+            self.__index().setdefault(obj.__class__.__name__, {})[key] = obj
 
     def save(self):
         """Serialize __objects to JSON file (path: __file_path)"""
@@ -53,14 +63,16 @@ class FileStorage:
             with open(self.__file_path, 'r') as f:
                 jo = json.load(f)
             for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+                self.new(classes[jo[key]["__class__"]](**jo[key]))
         except:
             pass
 
     def delete(self, obj=None):
         """Deletes obj from __objects if inside."""
         if obj is not None:
-            del self.__objects[obj.__class__.__name__ + '.' + obj.id]
+            key = obj.__class__.__name__ + '.' + obj.id
+            del self.__objects[key]
+            self.__index().get(obj.__class__.__name__, {}).pop(key, None)
             self.save()
 
     def close(self):
@@ -72,8 +84,7 @@ class FileStorage:
         if cls is not None and type(cls) is str and id is not None and\
            type(id) is str and cls in classes:
             key = cls + '.' + id
-            obj = self.__objects.get(key, None)
-            return obj
+            return self.__index().get(cls, {}).get(key, None)
         else:
             return None
 
@@ -81,7 +92,7 @@ class FileStorage:
         """Counts number of objects in storage"""
         total = 0
         if type(cls) == str and cls in classes:
-            total = len(self.all(cls))
+            total = len(self.__index().get(cls, {}))
         elif cls is None:
             total = len(self.__objects)
         return total
@@ -3,14 +3,39 @@
 """app.py to connect to API"""
 import os
 from models import storage
+from api.v1.cache import ResponseCache
 from api.v1.views import app_views
-from flask import Flask, Blueprint, jsonify, make_response
+from flask import Flask, Blueprint, abort, jsonify, make_response
 from flask_cors import CORS
 
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
 cors = CORS(app, resources={"/*": {"origins": "0.0.0.0"}})
+cache = ResponseCache(int(os.getenv('HBNB_API_CACHE', '0')),
+                      int(os.getenv('HBNB_API_CACHE_BYTES', str(64 << 20))))
+
+
+@app.before_request
+def cache_lookup():
+    """answers GET requests from the response cache"""
+    return cache.lookup()
+
+
+@app.after_request
+def cache_store(response):
+    """keeps the responses to GET requests in the response cache"""
+    return cache.store(response)
+
+
+@app.route('/api/v1/stats/cache', strict_slashes=False)
+def cache_stats():
+    """returns the size and counters of the response cache"""
+    if not cache.enabled:
+        abort(404)
+    response = jsonify(cache.stats())
+    response.cache_control.no_store = True
+    return response
 
 
 @app.teardown_appcontext
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""cache.py keeps the responses to GET requests until what they show
+changes in storage"""
+
+from api.v1.views.index import hbnbText
+import collections
+from flask import Response, g, request
+from models import storage
+import threading
+
+
+def tags(path, view_args):
+    """returns what the response to path depends on: a class name for a
+    list of its objects, (class name, id) for one object, or "*" for
+    anything"""
+    ids = set((view_args or {}).values())
+    segments = path.strip("/").split("/")[2:]
+    found = set()
+    i = 0
+    while i < len(segments):
+        name = hbnbText.get(segments[i])
+        if name is None:
+            return {"*"}
+        if i + 1 < len(segments) and segments[i + 1] in ids:
+            found.add((name, segments[i + 1]))
+            i += 2
+        else:
+            found.add(name)
+            i += 1
+    return found or {"*"}
+
+
+class ResponseCache:
+    """least recently used responses, bounded in count and in bytes"""
+
+    def __init__(self, max_entries, max_bytes):
+        """Instantiate an empty cache, disabled if max_entries is 0"""
+        # integer - most responses kept
+        self.__max_entries = max_entries
+        # integer - most bytes of response bodies kept
+        self.__max_bytes = max_bytes
+        # ordered dictionary - (body, status, headers, tags) per request
+        # key, least recently used first
+        self.__entries = collections.OrderedDict()
+        # dictionary - keys of the responses depending on each tag
+        self.__tagged = {}
+        # integer - bytes of the bodies kept
+        self.__bytes = 0
+        # integer - invalidations so far, responses built across one
+        # are not kept
+        self.__generation = 0
+        # dictionary - hits, misses, evictions and invalidations so far
+        self.__counters = {"hits": 0, "misses": 0, "evictions": 0,
+                           "invalidations": 0}
+        self.__lock = threading.RLock()
+        if self.enabled:
+            storage.subscribe(self.changed)
+
+    @property
+    def enabled(self):
+        """tells if responses are cached"""
+        return self.__max_entries > 0
+
+    def __key(self):
+        """returns the key of the current request"""
+        args = sorted(request.args.items(multi=True))
+        return (request.host, request.path, tuple(args))
+
+    def lookup(self):
+        """returns the cached response to the current GET request, None
+        when it must be built"""
+        if not self.enabled or request.method != 'GET':
+            return None
+        key = self.__key()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__counters["misses"] += 1
+                g.cache_key = key
+                g.cache_generation = self.__generation
+                return None
+            self.__entries.move_to_end(key)
+            self.__counters["hits"] += 1
+        body, status, headers, entry_tags = entry
+        return Response(body, status, headers)
+
+    def store(self, response):
+        """keeps response to the GET request that missed, returns it"""
+        key = g.pop('cache_key', None)
+        if key is None or response.status_code != 200 or \
+           response.cache_control.no_store or storage.routes_reads():
+            # a replica may not have the write that dropped the
+            # response yet, nothing would drop the stale one it gives
+            return response
+        generation = g.pop('cache_generation')
+        headers = [(name, value) for name, value in response.headers
+                   if name != 'Content-Length']
+        entry_tags = tags(request.path, request.view_args)
+        if response.is_streamed:
+            response.response = self.__capture(
+                response.response, key, generation, response.status_code,
+                headers, entry_tags)
+        else:
+            self.__put(key, generation, (response.get_data(),
+                                         response.status_code, headers,
+                                         entry_tags))
+        return response
+
+    def __capture(self, chunks, key, generation, status, headers,
+                  entry_tags):
+        """yields the chunks of a streamed body, then keeps the body"""
+        body = []
+        size = 0
+        try:
+            for chunk in chunks:
+                if body is not None:
+                    data = chunk.encode() if type(chunk) is str else chunk
+                    size += len(data)
+                    body.append(data)
+                    if size > self.__max_bytes:
+                        body = None
+                yield chunk
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        if body is not None:
+            self.__put(key, generation, (b"".join(body), status, headers,
+                                         entry_tags))
+
+    def __put(self, key, generation, entry):
+        """keeps entry under key unless storage changed since generation,
+        evicting the least recently used entries past the bounds"""
+        if len(entry[0]) > self.__max_bytes:
+            return
+        with self.__lock:
+            if generation != self.__generation:
+                return
+            self.__drop(key)
+            self.__entries[key] = entry
+            self.__bytes += len(entry[0])
+            for tag in entry[3]:
+                self.__tagged.setdefault(tag, set()).add(key)
+            while len(self.__entries) > self.__max_entries or \
+                    self.__bytes > self.__max_bytes:
+                self.__drop(next(iter(self.__entries)))
+                self.__counters["evictions"] += 1
+
+    def __drop(self, key):
+        """removes the entry under key, if any"""
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return
+        self.__bytes -= len(entry[0])
+        for tag in entry[3]:
+            keys = self.__tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self.__tagged[tag]
+
+    def changed(self, obj, deleted):
+        """storage listener dropping the responses showing obj, its class
+        or anything, or every response when any object may have changed"""
+        with self.__lock:
+            self.__generation += 1
+            if obj is None:
+                dropped = list(self.__entries)
+            else:
+                name = type(obj).__name__
+                dropped = set()
+                for tag in (name, (name, obj.id), "*"):
+                    dropped.update(self.__tagged.get(tag, ()))
+            for key in dropped:
+                self.__drop(key)
+            self.__counters["invalidations"] += len(dropped)
+
+    def stats(self):
+        """returns the size of the cache and its counters"""
+        with self.__lock:
+            stats = dict(self.__counters)
+            stats.update({"entries": len(self.__entries),
+                          "bytes": self.__bytes,
+                          "max_entries": self.__max_entries,
+                          "max_bytes": self.__max_bytes})
+        return stats
@@ -0,0 +1,9 @@
+#!/usr/bin/python3
+"""Initializes the search indexes behind the places_search, places_near
+and autocomplete endpoints."""
+
+from api.v1.search.columns import check_ranges
+from api.v1.search.geo import place_grid
+from api.v1.search.names import name_index
+from api.v1.search.places import search_places, walk_places
+from api.v1.search.text import text_index
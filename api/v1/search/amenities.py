@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+"""amenities.py keeps a bitmap index of the places having each amenity"""
+
+import models
+from models import storage
+import sqlalchemy
+import threading
+
+
+def linked_amenity_ids(place, load=True):
+    """returns the set of amenity ids linked to a place, or None if
+    load is False and they are not loaded from the database yet"""
+    if models.storage_t == 'db':
+        if not load and \
+           'amenities' in sqlalchemy.inspect(place).unloaded:
+            return None
+        return set(amenity.id for amenity in place.amenities)
+    return set(place.amenity_ids)
+
+
+class AmenityIndex:
+    """maps each amenity id to a bitset of place ordinals"""
+
+    def __init__(self):
+        """Instantiate an empty index, built on first use"""
+        # dictionary - ordinal of each indexed place id
+        self.__ordinals = {}
+        # list - place id of each ordinal, None once the ordinal is freed
+        self.__ids = []
+        # list - freed ordinals, reused before growing __ids
+        self.__free = []
+        # dictionary - bitset of place ordinals per amenity id
+        self.__bits = {}
+        # dictionary - amenity ids set in the bitsets per place id
+        self.__rows = {}
+        # boolean - the index must be rebuilt from storage before use
+        self.__stale = True
+        self.__lock = threading.RLock()
+        storage.subscribe(self.changed)
+
+    def __build(self):
+        """rebuilds the index from the places in storage"""
+        self.__ordinals = {}
+        self.__ids = []
+        self.__free = []
+        self.__bits = {}
+        self.__rows = {}
+        for place in storage.all('Place', load=('amenities',)).values():
+            self.__set(place.id, linked_amenity_ids(place))
+        self.__stale = False
+
+    def __ordinal(self, place_id):
+        """returns the ordinal of place_id, assigning one if needed"""
+        ordinal = self.__ordinals.get(place_id)
+        if ordinal is None:
+            if self.__free:
+                ordinal = self.__free.pop()
+                self.__ids[ordinal] = place_id
+            else:
+                ordinal = len(self.__ids)
+                self.__ids.append(place_id)
+            self.__ordinals[place_id] = ordinal
+        return ordinal
+
+    def __set(self, place_id, amenity_ids):
+        """replaces the amenities linked to place_id in the bitsets"""
+        old = self.__rows.pop(place_id, set())
+        if not old and not amenity_ids:
+            return
+        bit = 1 << self.__ordinal(place_id)
+        for amenity_id in old - amenity_ids:
+            bits = self.__bits[amenity_id] & ~bit
+            if bits:
+                self.__bits[amenity_id] = bits
+            else:
+                del self.__bits[amenity_id]
+        for amenity_id in amenity_ids - old:
+            self.__bits[amenity_id] = self.__bits.get(amenity_id, 0) | bit
+        if amenity_ids:
+            self.__rows[place_id] = set(amenity_ids)
+        else:
+            self.__free.append(self.__ordinals.pop(place_id))
+            self.__ids[bit.bit_length() - 1] = None
+
+    def changed(self, obj, deleted):
+        """storage listener keeping the bitsets in step with the writes"""
+        name = type(obj).__name__
+        with self.__lock:
+            if obj is None:
+                self.__stale = True
+            elif self.__stale:
+                return
+            elif name == 'Place':
+                amenity_ids = set() if deleted else \
+                    linked_amenity_ids(obj, load=False)
+                if amenity_ids is not None:
+                    self.__set(obj.id, amenity_ids)
+            elif name == 'Amenity' and deleted:
+                bits = self.__bits.get(obj.id, 0)
+                for place_id in self.place_ids(bits):
+                    self.__set(place_id, self.__rows[place_id] - {obj.id})
+            elif name == 'Amenity' and models.storage_t == 'db' and \
+                    'place_amenities' not in sqlalchemy.inspect(obj).unloaded:
+                # linked from the amenity side, the places may not know yet
+                self.__stale = True
+
+    def place_ids(self, bits):
+        """returns the ids of the places whose ordinals are set in bits"""
+        ids = []
+        ordinal = -1
+        reverse = bin(bits)[:1:-1]
+        while True:
+            ordinal = reverse.find('1', ordinal + 1)
+            if ordinal < 0:
+                return ids
+            ids.append(self.__ids[ordinal])
+
+    def places(self, amenity_ids):
+        """returns the ids of the places linked to all the amenities"""
+        with self.__lock:
+            if self.__stale:
+                self.__build()
+            bits = None
+            for amenity_id in amenity_ids:
+                if bits is None:
+                    bits = self.__bits.get(amenity_id, 0)
+                else:
+                    bits &= self.__bits.get(amenity_id, 0)
+                if not bits:
+                    return []
+            return self.place_ids(bits or 0)
+
+
+amenity_index = AmenityIndex()
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""columns.py keeps the numeric Place attributes as columns"""
+
+import math
+from models import storage
+import threading
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+fields = ("number_rooms", "number_bathrooms", "max_guest", "price_by_night",
+          "latitude", "longitude")
+
+
+def check_ranges(ranges):
+    """returns ranges as {field: (min, max)}, raises ValueError if invalid
+
+    ranges maps a field to [min, max], either bound may be null"""
+    if type(ranges) is not dict:
+        raise ValueError("ranges must be an object")
+    checked = {}
+    for field, bounds in ranges.items():
+        if field not in fields:
+            raise ValueError("Unknown range field: {}".format(field))
+        if type(bounds) is not list or len(bounds) != 2 or \
+           not all(bound is None or type(bound) in (int, float)
+                   for bound in bounds):
+            raise ValueError("Invalid range for {}".format(field))
+        checked[field] = tuple(bounds)
+    return checked
+
+
+def number(value):
+    """returns value as a float, NaN when it is not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class PlaceColumns:
+    """the numeric attributes of every Place, one array per field"""
+
+    def __init__(self):
+        """Instantiate an empty snapshot, built on first use"""
+        # dictionary - row of each place id
+        self.__rows = {}
+        # list - place id of each row, None once the row is freed
+        self.__ids = []
+        # list - freed rows, reused before growing the columns
+        self.__free = []
+        # dictionary - values per field, NaN for missing values
+        self.__columns = {}
+        # boolean - the snapshot must be rebuilt from storage before use
+        self.__stale = True
+        self.__lock = threading.RLock()
+        storage.subscribe(self.changed)
+
+    def __build(self):
+        """rebuilds the columns from the places in storage"""
+        places = list(storage.all('Place').values())
+        self.__rows = {place.id: row for row, place in enumerate(places)}
+        self.__ids = [place.id for place in places]
+        self.__free = []
+        self.__columns = {}
+        for field in fields:
+            values = [number(getattr(place, field, None))
+                      for place in places]
+            if numpy is not None:
+                values = numpy.array(values, dtype=numpy.float64)
+            self.__columns[field] = values
+        self.__stale = False
+
+    def __grow(self):
+        """adds a row at the end of the columns, returns it"""
+        row = len(self.__ids)
+        self.__ids.append(None)
+        for field, values in self.__columns.items():
+            if numpy is None:
+                values.append(math.nan)
+            elif row >= len(values):
+                grown = numpy.full(max(16, 2 * len(values)), math.nan)
+                grown[:len(values)] = values
+                self.__columns[field] = grown
+        return row
+
+    def __set(self, place):
+        """writes the values of place into its row"""
+        row = self.__rows.get(place.id)
+        if row is None:
+            row = self.__free.pop() if self.__free else self.__grow()
+            self.__rows[place.id] = row
+            self.__ids[row] = place.id
+        for field in fields:
+            self.__columns[field][row] = number(getattr(place, field, None))
+
+    def __drop(self, place_id):
+        """frees the row of place_id"""
+        row = self.__rows.pop(place_id, None)
+        if row is not None:
+            self.__ids[row] = None
+            for field in fields:
+                self.__columns[field][row] = math.nan
+            self.__free.append(row)
+
+    def changed(self, obj, deleted):
+        """storage listener keeping the columns in step with the writes"""
+        with self.__lock:
+            if obj is None:
+                self.__stale = True
+            elif self.__stale or type(obj).__name__ != 'Place':
+                return
+            elif deleted:
+                self.__drop(obj.id)
+            else:
+                self.__set(obj)
+
+    def places(self, ranges):
+        """returns the ids of the places within all the checked ranges"""
+        with self.__lock:
+            if self.__stale:
+                self.__build()
+            size = len(self.__ids)
+            if numpy is None:
+                rows = [row for row in range(size)
+                        if self.__ids[row] is not None]
+                for field, (low, high) in ranges.items():
+                    values = self.__columns[field]
+                    rows = [row for row in rows
+                            if (low is None or values[row] >= low) and
+                            (high is None or values[row] <= high)]
+                return [self.__ids[row] for row in rows]
+            mask = numpy.ones(size, dtype=bool)
+            for field, (low, high) in ranges.items():
+                values = self.__columns[field][:size]
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            return [self.__ids[row] for row in numpy.flatnonzero(mask)
+                    if self.__ids[row] is not None]
+
+
+place_columns = PlaceColumns()
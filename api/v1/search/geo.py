@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""geo.py keeps the places in a latitude/longitude grid"""
+
+import heapq
+import math
+import models
+from models import storage
+import threading
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# float - mean radius of the Earth in kilometers
+earth_km = 6371.0088
+# float - kilometers per degree of latitude
+degree_km = math.pi * earth_km / 180
+# float - width and height of a grid cell in degrees (about 5.5 km)
+cell_degrees = 0.05
+# integer - cells around each parallel
+columns = int(round(360 / cell_degrees))
+
+
+def haversine(lat, lng, lats, lngs):
+    """returns the distances in km from (lat, lng) to each point"""
+    if numpy is not None:
+        lats = numpy.radians(numpy.asarray(lats, dtype=numpy.float64))
+        lngs = numpy.radians(numpy.asarray(lngs, dtype=numpy.float64))
+        lat, lng = math.radians(lat), math.radians(lng)
+        a = numpy.sin((lats - lat) / 2) ** 2 + math.cos(lat) * \
+            numpy.cos(lats) * numpy.sin((lngs - lng) / 2) ** 2
+        return 2 * earth_km * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1)))
+    distances = []
+    for other_lat, other_lng in zip(lats, lngs):
+        a = math.sin(math.radians(other_lat - lat) / 2) ** 2 + \
+            math.cos(math.radians(lat)) * math.cos(math.radians(other_lat)) * \
+            math.sin(math.radians(other_lng - lng) / 2) ** 2
+        distances.append(2 * earth_km * math.asin(math.sqrt(min(a, 1))))
+    return distances
+
+
+def location(place):
+    """returns (latitude, longitude) of place, None when not a location"""
+    if models.storage_t != 'db' and \
+       ('latitude' not in place.__dict__ or
+            'longitude' not in place.__dict__):
+        # the class defaults 0.0 stand for coordinates never set
+        return None
+    try:
+        lat, lng = float(place.latitude), float(place.longitude)
+    except (TypeError, ValueError):
+        return None
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return None
+    return lat, lng
+
+
+def cell(lat, lng):
+    """returns the (row, column) of the grid cell holding a point"""
+    return (int(math.floor(lat / cell_degrees)),
+            int(math.floor((lng + 180) / cell_degrees)) % columns)
+
+
+class PlaceGrid:
+    """buckets the place locations by grid cell"""
+
+    def __init__(self):
+        """Instantiate an empty grid, built on first use"""
+        # dictionary - (latitude, longitude) by place id, per cell
+        self.__cells = {}
+        # dictionary - cell of each place id
+        self.__places = {}
+        # boolean - the grid must be rebuilt from storage before use
+        self.__stale = True
+        self.__lock = threading.RLock()
+        storage.subscribe(self.changed)
+
+    def __build(self):
+        """rebuilds the grid from the places in storage"""
+        self.__cells = {}
+        self.__places = {}
+        for place in storage.all('Place').values():
+            self.__set(place)
+        self.__stale = False
+
+    def __drop(self, place_id):
+        """removes place_id from its cell"""
+        key = self.__places.pop(place_id, None)
+        if key is not None:
+            points = self.__cells[key]
+            del points[place_id]
+            if not points:
+                del self.__cells[key]
+
+    def __set(self, place):
+        """moves place to the cell of its location"""
+        self.__drop(place.id)
+        point = location(place)
+        if point is not None:
+            key = cell(*point)
+            self.__cells.setdefault(key, {})[place.id] = point
+            self.__places[place.id] = key
+
+    def changed(self, obj, deleted):
+        """storage listener keeping the grid in step with the writes"""
+        with self.__lock:
+            if obj is None:
+                self.__stale = True
+            elif self.__stale or type(obj).__name__ != 'Place':
+                return
+            elif deleted:
+                self.__drop(obj.id)
+            else:
+                self.__set(obj)
+
+    def __candidates(self, lat, lng, radius_km):
+        """returns the cells that may hold points within radius_km"""
+        dlat = radius_km / degree_km
+        rows = range(int(math.floor((lat - dlat) / cell_degrees)),
+                     int(math.floor((lat + dlat) / cell_degrees)) + 1)
+        cos = math.cos(math.radians(min(abs(lat) + dlat, 90)))
+        if cos * 180 * degree_km <= radius_km:
+            # the circle reaches a pole or wraps around the Earth
+            cols = range(columns)
+        else:
+            dlng = radius_km / (degree_km * cos)
+            first = int(math.floor((lng - dlng + 180) / cell_degrees))
+            last = int(math.floor((lng + dlng + 180) / cell_degrees))
+            cols = range(first, min(last + 1, first + columns))
+        if len(rows) * len(cols) > len(self.__cells):
+            return [points for (row, col), points in self.__cells.items()
+                    if row in rows and (len(cols) == columns or
+                                        (col - cols.start) % columns <
+                                        len(cols))]
+        cells = []
+        for row in rows:
+            for col in cols:
+                points = self.__cells.get((row, col % columns))
+                if points:
+                    cells.append(points)
+        return cells
+
+    def near(self, lat, lng, radius_km, limit):
+        """returns the (distance km, place id) pairs within radius_km of
+        (lat, lng), nearest first, at most limit of them"""
+        with self.__lock:
+            if self.__stale:
+                self.__build()
+            ids = []
+            lats = []
+            lngs = []
+            for points in self.__candidates(lat, lng, radius_km):
+                for place_id, (point_lat, point_lng) in points.items():
+                    ids.append(place_id)
+                    lats.append(point_lat)
+                    lngs.append(point_lng)
+        distances = haversine(lat, lng, lats, lngs)
+        if numpy is not None:
+            rows = numpy.flatnonzero(distances <= radius_km)
+            if len(rows) > limit:
+                nearest = numpy.argpartition(distances[rows], limit)[:limit]
+                rows = rows[nearest]
+            rows = rows[numpy.argsort(distances[rows], kind="stable")]
+            return [(float(distances[row]), ids[row]) for row in rows]
+        return heapq.nsmallest(limit, [
+            (distance, place_id)
+            for distance, place_id in zip(distances, ids)
+            if distance <= radius_km])
+
+
+place_grid = PlaceGrid()
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""names.py keeps the state and city names sorted for prefix lookups"""
+
+from api.v1.search.text import normalize
+import bisect
+from models import storage
+import threading
+
+# tuple - classes whose names are indexed
+named = ("State", "City")
+
+
+class NameIndex:
+    """sorted (normalized name, class name, id, name) entries"""
+
+    def __init__(self):
+        """Instantiate an empty index, built on first use"""
+        # list - the entries, sorted
+        self.__entries = []
+        # dictionary - entry of each indexed object key
+        self.__keys = {}
+        # boolean - the entries must be rebuilt from storage before use
+        self.__stale = True
+        self.__lock = threading.RLock()
+        storage.subscribe(self.changed)
+
+    def __build(self):
+        """rebuilds the entries from the states and cities in storage"""
+        self.__keys = {}
+        for name in named:
+            for key, obj in storage.all(name).items():
+                self.__keys[key] = self.__entry(obj)
+        self.__entries = sorted(self.__keys.values())
+        self.__stale = False
+
+    def __entry(self, obj):
+        """returns the entry of obj"""
+        name = str(getattr(obj, "name", None) or "")
+        return (normalize(name), type(obj).__name__, obj.id, name)
+
+    def __remove(self, key):
+        """removes the entry of the object under key"""
+        entry = self.__keys.pop(key, None)
+        if entry is not None:
+            i = bisect.bisect_left(self.__entries, entry)
+            del self.__entries[i]
+
+    def changed(self, obj, deleted):
+        """storage listener keeping the entries in step with the writes"""
+        name = type(obj).__name__
+        with self.__lock:
+            if obj is None:
+                self.__stale = True
+            elif self.__stale or name not in named:
+                return
+            else:
+                key = name + "." + obj.id
+                entry = None if deleted else self.__entry(obj)
+                if entry == self.__keys.get(key):
+                    return
+                self.__remove(key)
+                if entry is not None:
+                    self.__keys[key] = entry
+                    bisect.insort(self.__entries, entry)
+
+    def complete(self, prefix, limit, classes=named):
+        """returns the first limit (class name, id, name) whose name
+        starts with prefix, in name order"""
+        prefix = normalize(prefix)
+        matches = []
+        with self.__lock:
+            if self.__stale:
+                self.__build()
+            i = bisect.bisect_left(self.__entries, (prefix,))
+            while i < len(self.__entries) and len(matches) < limit:
+                entry = self.__entries[i]
+                if not entry[0].startswith(prefix):
+                    break
+                if entry[1] in classes:
+                    matches.append(entry[1:])
+                i += 1
+        return matches
+
+
+name_index = NameIndex()
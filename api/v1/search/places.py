@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""places.py resolves a places_search request to Place objects"""
+
+from api.v1.search.amenities import amenity_index
+from api.v1.search.columns import place_columns
+from api.v1.search.text import text_index
+import models
+from models import storage
+
+
+def city_ids(states, cities):
+    """returns the ids of the listed cities, then of the states' cities"""
+    ids = []
+    seen = set()
+    for city_id in cities:
+        if city_id not in seen:
+            seen.add(city_id)
+            ids.append(city_id)
+    for state in storage.get_many('State', states):
+        for city in state.cities:
+            if city.id not in seen:
+                seen.add(city.id)
+                ids.append(city.id)
+    return ids
+
+
+def search_places(states, cities, amenities, ranges=None, q=None):
+    """returns the places in the states or cities having all amenities,
+    whose numeric attributes are within the checked ranges and whose
+    text matches every word of q, best matches first (a q without words
+    filters nothing)"""
+    scores = None if q is None else text_index.scores(q)
+    if models.storage_t == 'db':
+        places = storage.search_places(states, cities, amenities, ranges,
+                                       scores)
+    else:
+        places = walk_places(states, cities, amenities, ranges, scores)
+    if scores is not None:
+        places.sort(key=lambda place: scores[place.id], reverse=True)
+    return places
+
+
+def walk_places(states, cities, amenities, ranges=None, place_ids=None):
+    """search_places through the objects, the amenity bitmap index and
+    the Place columns, among place_ids if given"""
+    matching = None
+    required = set(amenity.id
+                   for amenity in storage.get_many('Amenity', amenities))
+    if required:
+        matching = amenity_index.places(required)
+    if ranges:
+        in_ranges = place_columns.places(ranges)
+        if matching is None:
+            matching = in_ranges
+        else:
+            in_ranges = set(in_ranges)
+            matching = [place_id for place_id in matching
+                        if place_id in in_ranges]
+    if place_ids is not None:
+        matching = list(place_ids) if matching is None else \
+            [place_id for place_id in matching if place_id in place_ids]
+    if not states and not cities:
+        if matching is None:
+            return list(storage.all('Place').values())
+        return storage.get_many('Place', matching)
+    if matching is not None:
+        matching = set(matching)
+    places = []
+    for city in storage.get_many('City', city_ids(states, cities)):
+        places.extend(place for place in city.places
+                      if matching is None or place.id in matching)
+    return places
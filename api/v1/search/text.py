@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+"""text.py keeps an inverted index of the words describing each place"""
+
+import atexit
+import json
+import math
+from models import storage
+import os
+import re
+import threading
+import unicodedata
+import zlib
+
+# dictionary - weight of each indexed attribute, per class name
+weights = {"Place": {"name": 3, "description": 1},
+           "Review": {"text": 1}}
+# set - words too common to tell places apart
+stopwords = {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from",
+             "in", "is", "it", "of", "on", "or", "the", "to", "with"}
+
+
+def normalize(text):
+    """returns text lowercased, without accents"""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """returns the normalized words of text, without stopwords"""
+    return [word for word in re.findall(r"\w+", normalize(text))
+            if word not in stopwords]
+
+
+def document(obj, known=None):
+    """returns (place id, checksum of the text, {word: weight}) for obj,
+    reusing the words of the known entry if the text did not change"""
+    name = type(obj).__name__
+    texts = [(str(getattr(obj, attr, None) or ""), weight)
+             for attr, weight in weights[name].items()]
+    place_id = obj.id if name == "Place" else getattr(obj, "place_id", None)
+    checksum = zlib.crc32("\0".join(text for text, weight in texts).encode())
+    if known is not None and known[0] == place_id and known[1] == checksum:
+        return known
+    terms = {}
+    for text, weight in texts:
+        for word in tokenize(text):
+            terms[word] = terms.get(word, 0) + weight
+    return place_id, checksum, terms
+
+
+class TextIndex:
+    """posting lists of the words of the places and their reviews"""
+
+    def __init__(self, path=None):
+        """Instantiate an empty index, persisted to path if given"""
+        # string - file the index is saved to and loaded from
+        self.__path = path
+        # dictionary - (place id, checksum, {word: weight}) per object key
+        self.__documents = {}
+        # dictionary - {place id: summed weight} per word
+        self.__postings = {}
+        # dictionary - indexed objects per place id
+        self.__places = {}
+        # boolean - the postings must be rebuilt before use
+        self.__stale = True
+        # boolean - the documents changed since the index was saved
+        self.__unsaved = False
+        self.__lock = threading.RLock()
+        storage.subscribe(self.changed)
+        if path:
+            atexit.register(self.save)
+
+    def __load(self):
+        """returns the documents saved to the index file, if any"""
+        try:
+            with open(self.__path, 'r') as f:
+                return {key: tuple(value)
+                        for key, value in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def save(self):
+        """writes the documents to the index file"""
+        with self.__lock:
+            if not self.__path or not self.__unsaved:
+                return
+            text = json.dumps(self.__documents)
+            self.__unsaved = False
+        with open(self.__path + ".tmp", 'w') as f:
+            f.write(text)
+        os.replace(self.__path + ".tmp", self.__path)
+
+    def __build(self):
+        """rebuilds the postings, tokenizing only the objects whose text
+        changed since they were last indexed or saved"""
+        known = self.__documents
+        if not known and self.__path:
+            known = self.__load()
+        self.__documents = {}
+        self.__postings = {}
+        self.__places = {}
+        for name in weights:
+            for key, obj in storage.all(name).items():
+                entry = document(obj, known.get(key))
+                if entry is not known.get(key):
+                    self.__unsaved = True
+                self.__add(key, entry)
+        if len(self.__documents) != len(known):
+            self.__unsaved = True
+        self.__stale = False
+
+    def __add(self, key, entry):
+        """adds the words of the object under key to the postings"""
+        place_id, checksum, terms = entry
+        self.__documents[key] = entry
+        self.__places[place_id] = self.__places.get(place_id, 0) + 1
+        for word, weight in terms.items():
+            postings = self.__postings.setdefault(word, {})
+            postings[place_id] = postings.get(place_id, 0) + weight
+
+    def __remove(self, key):
+        """removes the words of the object under key from the postings"""
+        entry = self.__documents.pop(key, None)
+        if entry is None:
+            return
+        place_id, checksum, terms = entry
+        self.__places[place_id] -= 1
+        if not self.__places[place_id]:
+            del self.__places[place_id]
+        for word, weight in terms.items():
+            postings = self.__postings[word]
+            postings[place_id] -= weight
+            if not postings[place_id]:
+                del postings[place_id]
+                if not postings:
+                    del self.__postings[word]
+
+    def changed(self, obj, deleted):
+        """storage listener keeping the postings in step with the writes"""
+        name = type(obj).__name__
+        with self.__lock:
+            if obj is None:
+                self.__stale = True
+            elif self.__stale or name not in weights:
+                return
+            else:
+                key = name + "." + obj.id
+                self.__remove(key)
+                if not deleted:
+                    self.__add(key, document(obj))
+                self.__unsaved = True
+
+    def scores(self, q):
+        """returns {place id: score} of the places matching every word
+        of q, scored by the weight of each word times its rarity, None
+        when q has no word to match (every place does)"""
+        words = set(tokenize(q))
+        if not words:
+            return None
+        with self.__lock:
+            if self.__stale:
+                self.__build()
+            lists = sorted((self.__postings.get(word, {}) for word in words),
+                           key=len)
+            total = len(self.__places)
+            scores = {}
+            for place_id in lists[0]:
+                if all(place_id in postings for postings in lists[1:]):
+                    scores[place_id] = sum(
+                        postings[place_id] *
+                        math.log(1 + total / len(postings))
+                        for postings in lists)
+            return scores
+
+
+text_index = TextIndex(os.getenv("HBNB_TEXT_INDEX"))
@@ -6,6 +6,7 @@ app_views = Blueprint("app_views", __name__, url_prefix="/api/v1")
 
 from api.v1.views.index import *
 from api.v1.views.amenities import *
+from api.v1.views.autocomplete import *
 from api.v1.views.cities import *
 from api.v1.views.places import *
 from api.v1.views.places_amenities import *
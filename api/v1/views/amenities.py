@@ -2,6 +2,7 @@
 """amenities.py"""
 
 from api.v1.views import app_views
+from api.v1.views.pages import page_response, stream_response, walk
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.amenity import Amenity
@@ -10,10 +11,10 @@ from models.amenity import Amenity
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
 def get_amenities():
     """get amenity information for all amenities"""
-    amenities = []
-    for amenity in storage.all("Amenity").values():
-        amenities.append(amenity.to_dict())
-    return jsonify(amenities)
+    page = page_response("Amenity")
+    if page is not None:
+        return page
+    return stream_response(walk("Amenity"))
 
 
 @app_views.route('/amenities/<string:amenity_id>', methods=['GET'],
@@ -0,0 +1,26 @@
+#!/usr/bin/python3
+"""autocomplete.py"""
+
+from api.v1.search import name_index
+from api.v1.search.names import named
+from api.v1.views import app_views
+from flask import jsonify, make_response, request
+
+
+@app_views.route('/autocomplete', methods=['GET'], strict_slashes=False)
+def get_autocomplete():
+    """lists the states and cities whose name starts with prefix"""
+    if 'prefix' not in request.args:
+        return make_response(jsonify({'error': 'Missing prefix'}), 400)
+    limit = request.args.get('limit', type=int) \
+        if 'limit' in request.args else 10
+    if limit is None or limit < 1:
+        return make_response(jsonify({'error': 'Invalid limit'}), 400)
+    classes = named
+    if 'type' in request.args:
+        if request.args['type'] not in named:
+            return make_response(jsonify({'error': 'Invalid type'}), 400)
+        classes = (request.args['type'],)
+    matches = name_index.complete(request.args['prefix'], limit, classes)
+    return jsonify([{'__class__': name, 'id': id, 'name': text}
+                    for name, id, text in matches])
@@ -3,6 +3,7 @@
 """cities.py"""
 
 from api.v1.views import app_views
+from api.v1.views.pages import stream_response, walk
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.state import State
@@ -16,10 +17,7 @@ def get_cities(state_id):
     state = storage.get("State", state_id)
     if state is None:
         abort(404)
-    cities = []
-    for city in state.cities:
-        cities.append(city.to_dict())
-    return jsonify(cities)
+    return stream_response(walk("City", "state_id", state.id))
 
 
 @app_views.route('/cities/<string:city_id>', methods=['GET'],
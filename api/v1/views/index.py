@@ -1,7 +1,8 @@
 #!/usr/bin/python3
 """index.py connect to API"""
 from api.v1.views import app_views
-from flask import Flask, Blueprint, jsonify
+from flask import Flask, Blueprint, abort, jsonify
+import models
 from models import storage
 
 
@@ -13,3 +14,28 @@ hbnbText = {
     "states": "State",
     "users": "User"
 }
+
+
+@app_views.route('/status', strict_slashes=False)
+def hbnbStatus():
+    """returns the status of the API"""
+    return jsonify({"status": "OK"})
+
+
+@app_views.route('/stats', strict_slashes=False)
+def hbnbStats():
+    """returns the number of objects by type"""
+    return_dict = {}
+    for key, value in hbnbText.items():
+        return_dict[key] = storage.count(value)
+    return jsonify(return_dict)
+
+
+@app_views.route('/stats/pool', strict_slashes=False)
+def hbnbPoolStats():
+    """returns the state and counters of the database connection pool"""
+    if models.storage_t != 'db':
+        abort(404)
+    response = jsonify(storage.pool_stats())
+    response.cache_control.no_store = True
+    return response
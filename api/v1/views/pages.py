@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""pages.py serves the list endpoints page by page, in id order"""
+
+import base64
+from flask import Response, current_app, jsonify, make_response, request, \
+    stream_with_context, url_for
+import itertools
+from models import storage
+
+# integer - objects per page when a cursor is given without a limit
+default_limit = 100
+# integer - objects read from storage and written out at a time, also
+#           the most objects a page may hold
+batch = 500
+
+
+def encode_cursor(id):
+    """returns the opaque cursor of the page after id"""
+    return base64.urlsafe_b64encode(id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """returns the id a cursor points after, raises ValueError if invalid"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.b64decode(padded.encode(), b"-_", validate=True).decode()
+
+
+def page_response(cls, attr=None, value=None):
+    """returns the page of cls objects asked by the limit and cursor
+    arguments, only those whose attr equals value if attr is given, or
+    None when neither argument was given
+
+    the Link header points to the next page (rel="next") if there is one"""
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    limit = request.args.get('limit', type=int) \
+        if 'limit' in request.args else default_limit
+    if limit is None or not 1 <= limit <= batch:
+        return make_response(jsonify({'error': 'Invalid limit'}), 400)
+    after = None
+    if 'cursor' in request.args:
+        try:
+            after = decode_cursor(request.args['cursor'])
+        except ValueError:
+            return make_response(jsonify({'error': 'Invalid cursor'}), 400)
+    objs = storage.page(cls, limit + 1, after, attr, value)
+    response = jsonify([obj.to_dict() for obj in objs[:limit]])
+    if len(objs) > limit:
+        args = dict(request.view_args or {})
+        args.update(request.args.to_dict())
+        args['limit'] = limit
+        args['cursor'] = encode_cursor(objs[limit - 1].id)
+        response.headers['Link'] = '<{}>; rel="next"'.format(
+            url_for(request.endpoint, _external=True, **args))
+    return response
+
+
+def walk(cls, attr=None, value=None):
+    """yields the cls objects in id order, only those whose attr equals
+    value if attr is given, reading them from storage batch by batch"""
+    after = None
+    while True:
+        objs = storage.page(cls, batch, after, attr, value)
+        for obj in objs:
+            yield obj
+        if len(objs) < batch:
+            return
+        after = objs[-1].id
+
+
+def stream_response(objs):
+    """returns a response streaming the dictionaries of objs as a JSON
+    array, serializing batch objects per chunk as compactly as jsonify"""
+    dumps = current_app.json.dumps
+
+    def generate():
+        """yields the chunks of the JSON array"""
+        yield "["
+        separator = ""
+        rest = iter(objs)
+        while True:
+            chunk = [dumps(obj.to_dict(), separators=(",", ":"))
+                     for obj in itertools.islice(rest, batch)]
+            if not chunk:
+                break
+            yield separator + ",".join(chunk)
+            separator = ","
+        yield "]\n"
+    return Response(stream_with_context(generate()),
+                    mimetype=current_app.json.mimetype)
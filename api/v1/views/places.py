@@ -1,7 +1,9 @@
 #!/usr/bin/python3
 """places.py."""
 
+from api.v1.search import check_ranges, place_grid, search_places
 from api.v1.views import app_views
+from api.v1.views.pages import page_response, stream_response, walk
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.city import City
@@ -16,10 +18,10 @@ def get_places(city_id):
     city = storage.get("City", city_id)
     if city is None:
         abort(404)
-    places = []
-    for place in city.places:
-        places.append(place.to_dict())
-    return jsonify(places)
+    page = page_response("Place", "city_id", city.id)
+    if page is not None:
+        return page
+    return stream_response(walk("Place", "city_id", city.id))
 
 
 @app_views.route('/places/<string:place_id>', methods=['GET'],
@@ -89,36 +91,42 @@ def post_places_search():
     """searches for a place"""
     if request.get_json() is not None:
         params = request.get_json()
-        states = params.get('states', [])
-        cities = params.get('cities', [])
-        amenities = params.get('amenities', [])
-        amenity_objects = []
-        for amenity_id in amenities:
-            amenity = storage.get('Amenity', amenity_id)
-            if amenity:
-                amenity_objects.append(amenity)
-        if states == cities == []:
-            places = storage.all('Place').values()
-        else:
-            places = []
-            for state_id in states:
-                state = storage.get('State', state_id)
-                state_cities = state.cities
-                for city in state_cities:
-                    if city.id not in cities:
-                        cities.append(city.id)
-            for city_id in cities:
-                city = storage.get('City', city_id)
-                for place in city.places:
-                    places.append(place)
-        confirmed_places = []
-        for place in places:
-            place_amenities = place.amenities
-            confirmed_places.append(place.to_dict())
-            for amenity in amenity_objects:
-                if amenity not in place_amenities:
-                    confirmed_places.pop()
-                    break
-        return jsonify(confirmed_places)
+        try:
+            ranges = check_ranges(params.get('ranges', {}))
+        except ValueError as error:
+            return make_response(jsonify({'error': str(error)}), 400)
+        q = params.get('q')
+        if q is not None and type(q) is not str:
+            return make_response(jsonify({'error': 'Invalid q'}), 400)
+        places = search_places(params.get('states', []),
+                               params.get('cities', []),
+                               params.get('amenities', []), ranges, q)
+        return stream_response(places)
     else:
         return make_response(jsonify({'error': 'Not a JSON'}), 400)
+
+
+@app_views.route('/places_near', methods=['GET'], strict_slashes=False)
+def get_places_near():
+    """lists the places within radius_km of lat/lng, nearest first"""
+    bounds = {'lat': (-90, 90), 'lng': (-180, 180),
+              'radius_km': (0, 40075)}
+    args = {}
+    for name, (low, high) in bounds.items():
+        if name not in request.args:
+            return make_response(jsonify({'error': 'Missing ' + name}), 400)
+        args[name] = request.args.get(name, type=float)
+        if args[name] is None or not low <= args[name] <= high:
+            return make_response(jsonify({'error': 'Invalid ' + name}), 400)
+    limit = request.args.get('limit', type=int) \
+        if 'limit' in request.args else 10
+    if limit is None or limit < 1:
+        return make_response(jsonify({'error': 'Invalid limit'}), 400)
+    near = place_grid.near(args['lat'], args['lng'], args['radius_km'], limit)
+    distances = {place_id: distance for distance, place_id in near}
+    places = []
+    for place in storage.get_many("Place", distances):
+        place_dict = place.to_dict()
+        place_dict['distance_km'] = distances[place.id]
+        places.append(place_dict)
+    return jsonify(places)
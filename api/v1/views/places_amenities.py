@@ -1,9 +1,9 @@
 #!/usr/bin/python3
 """places_amenitiess.py"""
 
-import os
 from api.v1.views import app_views
 from flask import abort, jsonify, make_response, request
+import models
 from models import storage
 from models.amenity import Amenity
 from models.place import Place
@@ -17,11 +17,7 @@ def get_place_amenities(place_id):
     if place is None:
         abort(404)
     amenities = []
-    if os.getenv('HBNB_TYPE_STORAGE') == 'db':
-        amenity_objects = place.amenities
-    else:
-        amenity_objects = place.amenity_ids
-    for amenity in amenity_objects:
+    for amenity in place.amenities:
         amenities.append(amenity.to_dict())
     return jsonify(amenities)
 
@@ -34,13 +30,15 @@ def delete_place_amenity(place_id, amenity_id):
     amenity = storage.get("Amenity", amenity_id)
     if place is None or amenity is None:
         abort(404)
-    if os.getenv('HBNB_TYPE_STORAGE') == 'db':
-        place_amenities = place.amenities
+    if models.storage_t == 'db':
+        if amenity not in place.amenities:
+            abort(404)
+        place.amenities.remove(amenity)
     else:
-        place_amenities = place.amenity_ids
-    if amenity not in place_amenities:
-        abort(404)
-    place_amenities.remove(amenity)
+        if amenity.id not in place.amenity_ids:
+            abort(404)
+        place.amenity_ids = [amenity_id for amenity_id in place.amenity_ids
+                             if amenity_id != amenity.id]
     place.save()
     return jsonify({})
 
@@ -53,12 +51,11 @@ def post_place_amenity(place_id, amenity_id):
     amenity = storage.get("Amenity", amenity_id)
     if place is None or amenity is None:
         abort(404)
-    if os.getenv('HBNB_TYPE_STORAGE') == 'db':
-        place_amenities = place.amenities
-    else:
-        place_amenities = place.amenity_ids
-    if amenity in place_amenities:
+    if amenity in place.amenities:
         return jsonify(amenity.to_dict())
-    place_amenities.append(amenity)
+    if models.storage_t == 'db':
+        place.amenities.append(amenity)
+    else:
+        place.amenities = amenity
     place.save()
-    return make_response(jsonify(amenityto_dict()), 201)
+    return make_response(jsonify(amenity.to_dict()), 201)
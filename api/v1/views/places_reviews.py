@@ -2,6 +2,7 @@
 """reviews.py"""
 
 from api.v1.views import app_views
+from api.v1.views.pages import page_response, stream_response, walk
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.review import Review
@@ -16,10 +17,10 @@ def get_reviews(place_id):
     place = storage.get("Place", place_id)
     if place is None:
         abort(404)
-    reviews = []
-    for review in place.reviews:
-        reviews.append(review.to_dict())
-    return jsonify(reviews)
+    page = page_response("Review", "place_id", place.id)
+    if page is not None:
+        return page
+    return stream_response(walk("Review", "place_id", place.id))
 
 
 @app_views.route('/reviews/<string:review_id>', methods=['GET'],
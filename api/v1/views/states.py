@@ -2,6 +2,7 @@
 """states.py"""
 
 from api.v1.views import app_views
+from api.v1.views.pages import page_response, stream_response, walk
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.state import State
@@ -10,10 +11,10 @@ from models.state import State
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
 def get_states():
     """gets state information for all states"""
-    states = []
-    for state in storage.all("State").values():
-        states.append(state.to_dict())
-    return jsonify(states)
+    page = page_response("State")
+    if page is not None:
+        return page
+    return stream_response(walk("State"))
 
 
 @app_views.route('/states/<string:state_id>', methods=['GET'],
@@ -2,6 +2,7 @@
 """users.py"""
 
 from api.v1.views import app_views
+from api.v1.views.pages import page_response, stream_response, walk
 from flask import abort, jsonify, make_response, request
 from models import storage
 from models.user import User
@@ -10,10 +11,10 @@ from models.user import User
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def get_users():
     """get user information for all users"""
-    users = []
-    for user in storage.all("User").values():
-        users.append(user.to_dict())
-    return jsonify(users)
+    page = page_response("User")
+    if page is not None:
+        return page
+    return stream_response(walk("User"))
 
 
 @app_views.route('/users/<string:user_id>', methods=['GET'],
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmarks for the FileStorage engine
+
+Usage: python3 -m benchmarks.bench_file_storage
+"""
+
+import os
+import tempfile
+import timeit
+from models.engine.file_storage import FileStorage
+from models.review import Review
+from models.state import State
+
+
+def bench_all_by_class(review_counts=(0, 10000, 100000, 500000), states=50):
+    """all("State") latency while the number of Reviews grows"""
+    storage = FileStorage()
+    FileStorage._FileStorage__objects = {}
+    for i in range(states):
+        storage.new(State(name="State {}".format(i)))
+    loaded = 0
+    print("{:>10} {:>16} {:>16}".format("reviews", "all(State) us",
+                                        "count(State) us"))
+    for total in review_counts:
+        for i in range(total - loaded):
+            storage.new(Review(text="review"))
+        loaded = total
+        runs = 1000
+        t_all = timeit.timeit(lambda: storage.all("State"), number=runs)
+        t_count = timeit.timeit(lambda: storage.count("State"), number=runs)
+        print("{:>10} {:>16.2f} {:>16.2f}".format(total,
+                                                  t_all / runs * 1e6,
+                                                  t_count / runs * 1e6))
+
+
+def bench_save_one_change(counts=(1000, 10000, 100000)):
+    """save() latency after changing a single object"""
+    storage = FileStorage()
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__file_path = path
+    print("{:>10} {:>16} {:>16}".format("objects", "first save ms",
+                                        "next save ms"))
+    for total in counts:
+        FileStorage._FileStorage__objects = {}
+        states = [State(name="State {}".format(i)) for i in range(total)]
+        for state in states:
+            storage.new(state)
+        t_first = timeit.timeit(storage.save, number=1)
+        states[0].name = "Renamed"
+        t_next = timeit.timeit(storage.save, number=1)
+        print("{:>10} {:>16.2f} {:>16.2f}".format(total, t_first * 1e3,
+                                                  t_next * 1e3))
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    bench_all_by_class()
+    bench_save_one_change()
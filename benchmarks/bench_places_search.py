@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+"""
+Benchmarks for places_search: the queries it emits in DB mode, and the
+amenity, range and distance filters and the name autocomplete in
+FileStorage mode
+
+Usage: HBNB_TYPE_STORAGE=sqlite HBNB_SQLITE_DB=/tmp/bench.db \\
+       python3 -m benchmarks.bench_places_search
+       python3 -m benchmarks.bench_places_search
+"""
+
+import os
+import random
+import tempfile
+import time
+import models
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+from sqlalchemy import event
+from api.v1.search import walk_places
+from api.v1.search.amenities import amenity_index
+from api.v1.search.columns import place_columns
+from api.v1.search.geo import haversine, place_grid
+from api.v1.search.names import name_index
+
+
+def place_objects(amenities):
+    """the amenity filter before the bitmap index: one subset test per
+    place"""
+    return [place for place in storage.all(Place).values()
+            if set(amenities) <= set(place.amenity_ids)]
+
+
+def populate(states=20, cities=10, places=20, amenities=10):
+    """fills the database with a random dataset, returns the ids"""
+    random.seed(0)
+    user = User(email="bench@hbnb.io", password="bench")
+    storage.new(user)
+    amenity_list = [Amenity(name="Amenity {}".format(i))
+                    for i in range(amenities)]
+    state_list = [State(name="State {}".format(i)) for i in range(states)]
+    city_list = []
+    for obj in amenity_list + state_list:
+        storage.new(obj)
+    for state in state_list:
+        for i in range(cities):
+            city = City(name="City {}".format(i), state_id=state.id)
+            storage.new(city)
+            city_list.append(city)
+            for j in range(places):
+                place = Place(name="Place {}".format(j), city_id=city.id,
+                              user_id=user.id,
+                              price_by_night=random.randint(10, 500),
+                              max_guest=random.randint(1, 10))
+                linked = random.sample(amenity_list, 3)
+                if models.storage_t == "db":
+                    place.amenities.extend(linked)
+                else:
+                    place.amenity_ids = [amenity.id for amenity in linked]
+                storage.new(place)
+    storage.save()
+    return ([state.id for state in state_list],
+            [city.id for city in city_list],
+            [amenity.id for amenity in amenity_list])
+
+
+def measure(search, states, cities, amenities):
+    """returns (queries, seconds, results) of one search"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        """records the statements sent to the database"""
+        statements.append(statement)
+    storage.close()
+    engine = storage._DBStorage__engine
+    event.listen(engine, "before_cursor_execute", record)
+    start = time.perf_counter()
+    places = [place.to_dict() for place in search(states, cities, amenities)]
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", record)
+    return len(statements), elapsed, len(places)
+
+
+def bench_places_search():
+    """compares the object walk with the single-query search"""
+    state_ids, city_ids, amenity_ids = populate()
+    cases = [("5 states", state_ids[:5], [], []),
+             ("5 states, 2 amenities", state_ids[:5], [], amenity_ids[:2]),
+             ("20 cities, 1 amenity", [], city_ids[:20], amenity_ids[:1])]
+    print("{:<24} {:>12} {:>12} {:>10} {:>10}".format(
+        "search", "walk queries", "SQL queries", "walk ms", "SQL ms"))
+    for name, states, cities, amenities in cases:
+        before = measure(walk_places, states, cities, amenities)
+        after = measure(storage.search_places, states, cities, amenities)
+        assert before[2] == after[2]
+        print("{:<24} {:>12} {:>12} {:>10.1f} {:>10.1f}".format(
+            name, before[0], after[0], before[1] * 1e3, after[1] * 1e3))
+
+
+def bench_amenity_filter(runs=20):
+    """compares the per-place subset test with the bitmap index"""
+    state_ids, city_ids, amenity_ids = populate(states=50, places=100)
+    amenity_index.places(amenity_ids[:1])
+    print("{:<12} {:>10} {:>12} {:>12}".format(
+        "amenities", "places", "scan ms", "bitmap ms"))
+    for count in (1, 2, 3):
+        required = amenity_ids[:count]
+        start = time.perf_counter()
+        for i in range(runs):
+            before = place_objects(required)
+        scan = (time.perf_counter() - start) / runs
+        start = time.perf_counter()
+        for i in range(runs):
+            after = amenity_index.places(required)
+        bitmap = (time.perf_counter() - start) / runs
+        assert len(before) == len(after)
+        print("{:<12} {:>10} {:>12.2f} {:>12.2f}".format(
+            count, len(after), scan * 1e3, bitmap * 1e3))
+
+
+def place_attributes(ranges):
+    """the range filter before the Place columns: one test per place"""
+    return [place for place in storage.all(Place).values()
+            if all((low is None or getattr(place, attr) >= low) and
+                   (high is None or getattr(place, attr) <= high)
+                   for attr, (low, high) in ranges.items())]
+
+
+def bench_range_filter(runs=20):
+    """compares the per-place attribute tests with the Place columns"""
+    ranges = {"price_by_night": (100, 200), "max_guest": (4, None)}
+    place_columns.places(ranges)
+    start = time.perf_counter()
+    for i in range(runs):
+        before = place_attributes(ranges)
+    scan = (time.perf_counter() - start) / runs
+    start = time.perf_counter()
+    for i in range(runs):
+        after = place_columns.places(ranges)
+    columns = (time.perf_counter() - start) / runs
+    assert len(before) == len(after)
+    print("{:>10} {:>12} {:>12}".format("places", "scan ms", "columns ms"))
+    print("{:>10} {:>12.2f} {:>12.2f}".format(len(after), scan * 1e3,
+                                              columns * 1e3))
+
+
+def scan_near(lat, lng, radius_km, limit):
+    """places_near before the grid: the distance to every place"""
+    places = list(storage.all(Place).values())
+    distances = haversine(lat, lng, [place.latitude for place in places],
+                          [place.longitude for place in places])
+    return sorted((distance, place.id)
+                  for distance, place in zip(distances, places)
+                  if distance <= radius_km)[:limit]
+
+
+def bench_places_near(total=200000, runs=20):
+    """compares a full distance scan with the grid"""
+    random.seed(0)
+    for i in range(total):
+        storage.new(Place(name="Near {}".format(i),
+                          latitude=random.uniform(25, 49),
+                          longitude=random.uniform(-124, -67)))
+    place_grid.near(37.77, -122.42, 1, 1)
+    print("{:>10} {:>10} {:>12} {:>12}".format("places", "radius km",
+                                               "scan ms", "grid ms"))
+    for radius in (5, 25, 100):
+        start = time.perf_counter()
+        before = scan_near(37.77, -122.42, radius, 10)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(runs):
+            after = place_grid.near(37.77, -122.42, radius, 10)
+        grid = (time.perf_counter() - start) / runs
+        assert len(before) == len(after)
+        print("{:>10} {:>10} {:>12.2f} {:>12.2f}".format(
+            total, radius, scan * 1e3, grid * 1e3))
+
+
+def scan_names(prefix, limit):
+    """autocomplete before the name index: every state and city"""
+    prefix = prefix.lower()
+    names = [(obj.name.lower(), obj.id)
+             for cls in (State, City) for obj in storage.all(cls).values()
+             if obj.name.lower().startswith(prefix)]
+    return sorted(names)[:limit]
+
+
+def bench_autocomplete(cities=50000, runs=100):
+    """compares a scan of every state and city with the name index"""
+    random.seed(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    for i in range(cities):
+        storage.new(City(name="".join(random.choice(letters)
+                                      for j in range(8))))
+    name_index.complete("", 1)
+    print("{:>10} {:>10} {:>12} {:>12}".format("cities", "prefix",
+                                               "scan us", "index us"))
+    for prefix in ("c", "ci", "cit"):
+        start = time.perf_counter()
+        before = scan_names(prefix, 10)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(runs):
+            after = name_index.complete(prefix, 10)
+        index = (time.perf_counter() - start) / runs
+        assert len(before) == len(after)
+        print("{:>10} {:>10} {:>12.1f} {:>12.1f}".format(
+            cities, prefix, scan * 1e6, index * 1e6))
+
+
+if __name__ == "__main__":
+    if models.storage_t == "db":
+        bench_places_search()
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "file.json")
+        storage._FileStorage__file_path = path
+        bench_amenity_filter()
+        bench_range_filter()
+        bench_places_near()
+        bench_autocomplete()
+        os.remove(path)
@@ -47,6 +47,13 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and lets the storage re-index the object"""
+            old = self.__dict__.get(name)
+            super().__setattr__(name, value)
+            models.storage.changed(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -68,6 +75,8 @@ class BaseModel:
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
+            for key in self.__mapper__.relationships.keys():
+                new_dict.pop(key, None)
         return new_dict
 
     def delete(self):
@@ -13,46 +13,168 @@ from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import create_engine, distinct, event, func, or_, select
+from sqlalchemy.orm import Session, scoped_session, selectinload, \
+    sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import UpdateBase
+import random
+import threading
+import time
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# create_engine() pool argument and its type, by environment variable
+pool_settings = {"HBNB_POOL_SIZE": ("pool_size", int),
+                 "HBNB_POOL_MAX_OVERFLOW": ("max_overflow", int),
+                 "HBNB_POOL_TIMEOUT": ("pool_timeout", float),
+                 "HBNB_POOL_RECYCLE": ("pool_recycle", int),
+                 "HBNB_POOL_PRE_PING": ("pool_pre_ping", lambda v: v == "1")}
+
+
+def pool_options():
+    """returns the create_engine() pool arguments set in the environment"""
+    options = {"poolclass": MeteredQueuePool}
+    for variable, (argument, kind) in pool_settings.items():
+        value = getenv(variable)
+        if value:
+            options[argument] = kind(value)
+    return options
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool counting how long connection checkouts take"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate the pool with zeroed counters"""
+        super().__init__(*args, **kwargs)
+        self.metrics = {"checkouts": 0, "timeouts": 0, "wait_seconds": 0.0,
+                        "max_wait_seconds": 0.0}
+        self.metrics_lock = threading.Lock()
+
+    def _do_get(self):
+        """returns a pooled connection, timing the wait for it"""
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            with self.metrics_lock:
+                self.metrics["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - start
+        with self.metrics_lock:
+            self.metrics["checkouts"] += 1
+            self.metrics["wait_seconds"] += waited
+            if waited > self.metrics["max_wait_seconds"]:
+                self.metrics["max_wait_seconds"] = waited
+        return connection
+
+
+class RoutingSession(Session):
+    """Session reading from a replica until it writes, then from the
+    primary until it is closed"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        """returns the engine a statement runs on"""
+        replicas = self.info.get("replicas")
+        if not replicas or self._flushing or self.info.get("wrote") or \
+           isinstance(clause, UpdateBase):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if "replica" not in self.info:
+            self.info["replica"] = random.choice(replicas)
+        return self.info["replica"]
+
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # list - engines of the read replicas, empty to read from __engine
+    __replicas = []
+    # integer - most IDs bound to one IN (...) query of get_many()
+    __batch = 500
+    # dictionary - rows per class name, missing while cold
+    __counts = {}
+    __counts_lock = threading.Lock()
+    # float - seconds between two reloads of the counters by close(),
+    #         which catch up with the rows other processes wrote
+    __resync = 5.0
+    # float - time.monotonic() of the last reload of the counters
+    __synced = 0.0
+    # tuple - rows and latest update of each table at the last reload
+    __tables = None
+    # list - callbacks told about every object committed or deleted
+    __listeners = []
 
     def __init__(self):
         """Instantiate a DBStorage object"""
-        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
-        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
-        HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
-        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        self.__resync = float(getenv('HBNB_DB_RESYNC', '5'))
+        self.__engine = self._create_engine()
+        self.__replicas = [self._create_engine(replica)
+                           for replica in self._replicas()]
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def _replicas(self):
+        """returns the hosts of the read replicas"""
+        hosts = getenv('HBNB_MYSQL_REPLICA_HOSTS', '')
+        return [host.strip() for host in hosts.split(',') if host.strip()]
+
+    def _create_engine(self, replica=None):
+        """returns the engine connected to the MySQL database,
+        on the replica host if given"""
+        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
+        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
+        HBNB_MYSQL_HOST = replica or getenv('HBNB_MYSQL_HOST')
+        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
+        return create_engine('mysql+mysqldb://{}:{}@{}/{}'.
+                             format(HBNB_MYSQL_USER,
+                                    HBNB_MYSQL_PWD,
+                                    HBNB_MYSQL_HOST,
+                                    HBNB_MYSQL_DB),
+                             **pool_options())
+
+    def all(self, cls=None, load=()):
+        """query on the current database session, eager loading the
+        relationships named in load (dotted for nested ones)"""
         new_dict = {}
         for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+            if cls is None or cls is classes[clss] or cls == clss:
+                query = self.__session.query(classes[clss])
+                options = self.__loaders(classes[clss], load)
+                if options:
+                    query = query.options(*options)
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def __loaders(self, cls, load):
+        """returns the selectin loader options of the load paths that
+        start on cls"""
+        options = []
+        for path in load:
+            option = None
+            target = cls
+            for name in path.split("."):
+                attr = getattr(target, name, None)
+                if attr is None or name not in \
+                   sqlalchemy.inspect(target).relationships:
+                    option = None
+                    break
+                option = selectinload(attr) if option is None else \
+                    option.selectinload(attr)
+                target = attr.property.mapper.class_
+            if option is not None:
+                options.append(option)
+        return options
+
     def new(self, obj):
         """add the object to the current database session"""
+        self.__session.info["wrote"] = True
         self.__session.add(obj)
 
     def save(self):
@@ -62,15 +184,226 @@ class DBStorage:
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
+            self.__session.info["wrote"] = True
             self.__session.delete(obj)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        self.migrate()
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession,
+                                    info={"replicas": self.__replicas})
+        event.listen(sess_factory, "after_flush", self.__after_flush)
+        event.listen(sess_factory, "after_commit", self.__after_commit)
+        event.listen(sess_factory, "after_rollback", self.__after_rollback)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        self.__counts = {}
+        self.__synced = time.monotonic()
+        self.__tables = self.__tables_state()
+        self.__notify(None)
+
+    def migrate(self, engine=None):
+        """creates the indexes the models declare on tables created
+        before them, in the database or on engine if given"""
+        engine = engine or self.__engine
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
 
     def close(self):
-        """call remove() method on the private session attribute"""
+        """call remove() method on the private session attribute, the
+        next session reads from a replica again. Every __resync seconds
+        the row counters are reloaded and, if the tables changed, the
+        listeners are told to start over: other processes may have
+        written meanwhile"""
         self.__session.remove()
+        with self.__counts_lock:
+            now = time.monotonic()
+            if now - self.__synced < self.__resync:
+                return
+            self.__synced = now
+        tables = self.__tables_state()
+        with self.__counts_lock:
+            changed = tables != self.__tables
+            self.__tables = tables
+            self.__counts = dict(zip(classes, tables[:-1:2]))
+        if changed:
+            self.__notify(None)
+
+    def routes_reads(self):
+        """tells if reads may go to replicas, which lag behind the
+        writes"""
+        return bool(self.__replicas)
+
+    def pool_stats(self):
+        """returns the state and counters of the connection pool, with
+        those of the replica pools in a list under replicas"""
+        stats = self.__pool_stats(self.__engine)
+        stats["replicas"] = [self.__pool_stats(engine)
+                             for engine in self.__replicas]
+        return stats
+
+    def __pool_stats(self, engine):
+        """returns the state and counters of the pool of engine"""
+        pool = engine.pool
+        stats = {"size": pool.size(), "checked_in": pool.checkedin(),
+                 "checked_out": pool.checkedout(),
+                 "overflow": max(pool.overflow(), 0),
+                 "timeout": pool.timeout()}
+        with pool.metrics_lock:
+            stats.update(pool.metrics)
+        return stats
+
+    def get(self, cls, id):
+        """returns the object based on the class and its ID, or None"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values() or id is None:
+            return None
+        return self.__session.get(cls, id)
+
+    def get_many(self, cls, ids):
+        """returns the objects of the class with the given IDs, in their
+        order, querying only for the ones not in the session already"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        ids = list(dict.fromkeys(id for id in ids if id is not None))
+        mapper = sqlalchemy.inspect(cls)
+        found = {}
+        missing = []
+        for id in ids:
+            key = mapper.identity_key_from_primary_key([id])
+            obj = self.__session.identity_map.get(key)
+            if obj is None:
+                missing.append(id)
+            else:
+                found[id] = obj
+        for i in range(0, len(missing), self.__batch):
+            batch = missing[i:i + self.__batch]
+            for obj in self.__session.query(cls).filter(cls.id.in_(batch)):
+                found[obj.id] = obj
+        return [found[id] for id in ids if id in found]
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns at most limit objects of the class in id order, from
+        the first id after the given one, only those whose attribute attr
+        equals value if attr is given, seeking in the index on id or on
+        (attr, id)"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        query = self.__session.query(cls)
+        if attr is not None:
+            query = query.filter(getattr(cls, attr) == value)
+        if after is not None:
+            query = query.filter(cls.id > after)
+        return query.order_by(cls.id).limit(limit).all()
+
+    def count(self, cls=None):
+        """returns the number of objects in storage matching the class"""
+        if type(cls) is str:
+            cls = classes.get(cls)
+        elif cls is None:
+            return sum(self.__warm_counts().values())
+        if cls not in classes.values():
+            return 0
+        return self.__warm_counts()[cls.__name__]
+
+    def search_places(self, states, cities, amenities, ranges=None,
+                      place_ids=None):
+        """returns the places in the states or cities having all amenities,
+        within the (min, max) ranges by attribute and among place_ids if
+        given, in a single query"""
+        if place_ids is not None and not place_ids:
+            return []
+        from models.place import place_amenity
+        query = self.__session.query(Place)
+        if states or cities:
+            query = query.join(City, Place.city_id == City.id).filter(
+                or_(City.id.in_(cities), City.state_id.in_(states)))
+        if amenities:
+            known = select(func.count()).select_from(Amenity).where(
+                Amenity.id.in_(amenities)).scalar_subquery()
+            having_all = select(place_amenity.c.place_id).where(
+                place_amenity.c.amenity_id.in_(amenities)).group_by(
+                place_amenity.c.place_id).having(
+                func.count(distinct(place_amenity.c.amenity_id)) == known)
+            query = query.filter(or_(known == 0, Place.id.in_(having_all)))
+        for attr, (low, high) in (ranges or {}).items():
+            if low is not None:
+                query = query.filter(getattr(Place, attr) >= low)
+            if high is not None:
+                query = query.filter(getattr(Place, attr) <= high)
+        if place_ids is not None:
+            query = query.filter(Place.id.in_(list(place_ids)))
+        return query.all()
+
+    def subscribe(self, callback):
+        """calls callback(obj, deleted) after a commit added, changed or
+        deleted obj, and callback(None, False) when any object may have"""
+        DBStorage.__listeners.append(callback)
+
+    def __notify(self, obj, deleted=False):
+        """tells the listeners that obj changed"""
+        for callback in DBStorage.__listeners:
+            callback(obj, deleted)
+
+    def __warm_counts(self):
+        """returns the row counters, loading them in one query when cold"""
+        counts = self.__counts
+        if len(counts) < len(classes):
+            row = self.__session.execute(select(*[
+                select(func.count()).select_from(clss).scalar_subquery()
+                for clss in classes.values()])).one()
+            with self.__counts_lock:
+                counts.update(zip(classes, row))
+        return counts
+
+    def __tables_state(self):
+        """returns the rows and the latest update of each class table,
+        then the rows of place_amenity, read from the primary in one
+        query"""
+        from models.place import place_amenity
+        columns = []
+        for clss in classes.values():
+            columns.append(select(func.count()).select_from(clss)
+                           .scalar_subquery())
+            columns.append(select(func.max(clss.updated_at))
+                           .scalar_subquery())
+        columns.append(select(func.count()).select_from(place_amenity)
+                       .scalar_subquery())
+        with self.__engine.connect() as connection:
+            return tuple(connection.execute(select(*columns)).one())
+
+    def __after_flush(self, session, flush_context):
+        """records the rows a flush added or removed, per class"""
+        deltas = session.info.setdefault("count_deltas", {})
+        for objs, delta in [(session.new, 1), (session.deleted, -1)]:
+            for obj in objs:
+                name = obj.__class__.__name__
+                deltas[name] = deltas.get(name, 0) + delta
+        session.info["wrote"] = True
+        changes = session.info.setdefault("changes", [])
+        changes.extend((obj, False) for obj in session.new)
+        changes.extend((obj, False) for obj in session.dirty)
+        changes.extend((obj, True) for obj in session.deleted)
+
+    def __after_commit(self, session):
+        """applies the committed row deltas to the warm counters"""
+        deltas = session.info.pop("count_deltas", {})
+        with self.__counts_lock:
+            for name, delta in deltas.items():
+                if name in self.__counts:
+                    self.__counts[name] += delta
+        for obj, deleted in session.info.pop("changes", []):
+            self.__notify(obj, deleted)
+
+    def __after_rollback(self, session):
+        """forgets the row deltas and changes of rolled back flushes"""
+        session.info.pop("count_deltas", None)
+        session.info.pop("changes", None)
@@ -3,7 +3,12 @@
 Contains the FileStorage class
 """
 
+import atexit
+import bisect
 import json
+import os
+import threading
+import zlib
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -15,56 +20,587 @@ from models.user import User
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# foreign key attributes of each class that get a reverse index
+relations = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+             "Review": ("place_id", "user_id")}
+
 
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
+    # boolean - store one JSON object per line (JSON Lines) in the file
+    __lines = os.getenv("HBNB_FILE_FORMAT") == "jsonl"
     # string - path to the JSON file
-    __file_path = "file.json"
+    __file_path = "file.jsonl" if __lines else "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects grouped by class name
+    __by_class = {}
+    # dictionary - children by <class name>.<foreign key> then parent id
+    __children = {}
+    # dictionary - sorted ids by class name or (<class name>.<foreign key>,
+    # parent id), built by the first page() asking for them
+    __sorted = {}
+    # dictionary - the __objects dict that the indexes were built from
+    __indexed = None
+    # boolean - append changed records to <__file_path>.journal on save()
+    __journal = os.getenv("HBNB_FILE_JOURNAL") == "1"
+    # integer - journal records that trigger a compaction into __file_path
+    __journal_max = int(os.getenv("HBNB_FILE_JOURNAL_MAX", "10000"))
+    # integer - records currently in the journal
+    __journal_len = 0
+    # set - keys created, changed or deleted since the last save
+    __dirty = set()
+    # dictionary - last serialized (object, JSON text) pair of each key
+    __fragments = {}
+    # float - seconds between background flushes, 0 writes on every save()
+    __flush_interval = float(os.getenv("HBNB_FILE_FLUSH_INTERVAL", "0"))
+    # integer - dirty objects that wake the background flusher early
+    __flush_dirty = int(os.getenv("HBNB_FILE_FLUSH_DIRTY", "100"))
+    # integer - most dirty objects save() leaves unflushed (lost on a crash)
+    __max_unflushed = int(os.getenv("HBNB_FILE_MAX_UNFLUSHED", "1000"))
+    # thread - the background flusher, started by the first save()
+    __flusher = None
+    # event - set to make the background flusher write right away
+    __wake = threading.Event()
+    # lock - guards the objects, indexes and dirty set across threads
+    __lock = threading.RLock()
+    # lock - serializes writes to the JSON file and the journal
+    __flush_lock = threading.RLock()
+    # dictionary - (mtime, size, inode) of the files as last read or written
+    __stamps = {}
+    # integer - bytes of the journal already applied to __objects
+    __journal_offset = 0
+    # integer - files per class in <__file_path stem>.d/, 0 for one file
+    __shards = int(os.getenv("HBNB_FILE_SHARDS", "0"))
+    # set - shard files holding objects changed since the last compaction
+    __dirty_shards = set()
+    # list - callbacks told about every object added, changed or deleted
+    __listeners = []
+
+    def __index(self):
+        """returns __by_class, rebuilding indexes if __objects was replaced"""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__by_class = {}
+            FileStorage.__children = {}
+            FileStorage.__sorted = {}
+            FileStorage.__indexed = FileStorage.__objects
+            for key, value in FileStorage.__objects.items():
+                self.__link(key, value)
+            self.__notify(None)
+        return FileStorage.__by_class
+
+    def __link(self, key, obj, attrs=None):
+        """adds obj to the indexes, or only to the given reverse indexes"""
+        name = obj.__class__.__name__
+        if attrs is None:
+            FileStorage.__by_class.setdefault(name, {})[key] = obj
+            self.__insort(name, obj.id)
+            attrs = relations.get(name, ())
+        for attr in attrs:
+            parents = FileStorage.__children.setdefault(name + "." + attr, {})
+            parents.setdefault(getattr(obj, attr, None), {})[key] = obj
+            self.__insort((name + "." + attr, getattr(obj, attr, None)),
+                          obj.id)
+
+    def __unlink(self, key, obj, values=None):
+        """removes obj from the indexes, or from the given reverse indexes"""
+        name = obj.__class__.__name__
+        if values is None:
+            FileStorage.__by_class.get(name, {}).pop(key, None)
+            self.__unsort(name, obj.id)
+            values = {attr: getattr(obj, attr, None)
+                      for attr in relations.get(name, ())}
+        for attr, value in values.items():
+            parents = FileStorage.__children.get(name + "." + attr, {})
+            children = parents.get(value, {})
+            children.pop(key, None)
+            self.__unsort((name + "." + attr, value), obj.id)
+            if not children:
+                parents.pop(value, None)
+
+    def __insort(self, name, id):
+        """adds id to the sorted ids under name, if they were built"""
+        ids = FileStorage.__sorted.get(name)
+        if ids is not None:
+            i = bisect.bisect_left(ids, id)
+            if i == len(ids) or ids[i] != id:
+                ids.insert(i, id)
+
+    def __unsort(self, name, id):
+        """removes id from the sorted ids under name, if they were built"""
+        ids = FileStorage.__sorted.get(name)
+        if ids is not None:
+            i = bisect.bisect_left(ids, id)
+            if i < len(ids) and ids[i] == id:
+                del ids[i]
+            if not ids:
+                del FileStorage.__sorted[name]
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def all(self, cls=None, load=()):
+        """returns the dictionary __objects, load is accepted for
+        DBStorage compatibility: relationships are already indexed"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            if type(cls) is not str:
+                cls = cls.__name__
+            return dict(self.__index().get(cls, {}))
         return self.__objects
 
+    def __put(self, key, obj):
+        """stores obj under key and indexes it"""
+        self.__index()
+        old = self.__objects.get(key)
+        if old is not None:
+            self.__unlink(key, old)
+        self.__objects[key] = obj
+        self.__link(key, obj)
+
+    def __drop(self, key):
+        """removes the object stored under key, if any"""
+        FileStorage.__fragments.pop(key, None)
+        if key in self.__objects:
+            self.__index()
+            self.__unlink(key, self.__objects.pop(key))
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with FileStorage.__lock:
+                self.__put(key, obj)
+                self.__mark(key)
+            self.__notify(obj)
 
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        if self.__flush_interval > 0 and \
+           len(FileStorage.__dirty) < self.__max_unflushed:
+            self.__start_flusher()
+            if len(FileStorage.__dirty) >= self.__flush_dirty:
+                FileStorage.__wake.set()
+            return
+        self.flush()
 
-    def reload(self):
-        """deserializes the JSON file to __objects"""
+    def flush(self):
+        """writes the pending changes to the journal or the JSON file"""
+        with FileStorage.__flush_lock:
+            if self.__journal:
+                self.__append()
+                if FileStorage.__journal_len < self.__journal_max:
+                    return
+            self.compact()
+
+    def __start_flusher(self):
+        """starts the background thread that flushes pending changes"""
+        with FileStorage.__lock:
+            if FileStorage.__flusher is not None:
+                return
+            FileStorage.__flusher = threading.Thread(
+                target=self.__flush_loop, name="FileStorage-flusher",
+                daemon=True)
+            FileStorage.__flusher.start()
+            atexit.register(self.__flush_pending)
+
+    def __flush_loop(self):
+        """flushes every __flush_interval seconds or when woken up"""
+        while self.__flush_interval > 0:
+            FileStorage.__wake.wait(self.__flush_interval)
+            FileStorage.__wake.clear()
+            self.__flush_pending()
+        FileStorage.__flusher = None
+
+    def __flush_pending(self):
+        """flushes if objects changed since the last write"""
+        if FileStorage.__dirty:
+            self.flush()
+
+    def __fragment(self, key, obj):
+        """returns the JSON text of obj, serializing it only if it changed"""
+        cached = FileStorage.__fragments.get(key)
+        if cached is None or cached[0] is not obj or key in self.__dirty:
+            cached = (obj, json.dumps(obj.to_dict()))
+            FileStorage.__fragments[key] = cached
+        return cached[1]
+
+    def __write(self, path, text, mode):
+        """writes text to path and waits for it to reach the disk"""
+        with open(path, mode) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __mark(self, key):
+        """records that the object under key changed since the last save"""
+        FileStorage.__dirty.add(key)
+        if self.__shards:
+            FileStorage.__dirty_shards.add(self.__shard(key))
+
+    def __shard_dir(self):
+        """returns the directory holding the shard files"""
+        return os.path.splitext(self.__file_path)[0] + ".d"
+
+    def __shard(self, key):
+        """returns the path of the shard file holding key"""
+        name, id = key.split(".", 1)
+        if self.__shards > 1:
+            name += "." + str(zlib.crc32(id.encode()) % self.__shards)
+        ext = ".jsonl" if self.__lines else ".json"
+        return os.path.join(self.__shard_dir(), name + ext)
+
+    def __dump(self, items):
+        """returns the file content for the (key, object) pairs"""
+        if self.__lines:
+            return "".join(self.__fragment(key, obj) + "\n"
+                           for key, obj in items)
+        return "{" + ", ".join(json.dumps(key) + ": " +
+                               self.__fragment(key, obj)
+                               for key, obj in items) + "}"
+
+    def __dump_shards(self):
+        """returns the content of the shard files that changed, by path"""
+        if os.path.isdir(self.__shard_dir()):
+            paths = FileStorage.__dirty_shards
+        else:
+            os.makedirs(self.__shard_dir())
+            paths = set(self.__shard(key) for key in self.__objects)
+        groups = {path: [] for path in paths}
+        names = set(os.path.basename(path).split(".")[0] for path in paths)
+        for name in names:
+            for key, obj in self.__index().get(name, {}).items():
+                path = self.__shard(key)
+                if path in groups:
+                    groups[path].append((key, obj))
+        return {path: self.__dump(items) for path, items in groups.items()}
+
+    def compact(self):
+        """writes every object to the JSON file and empties the journal"""
+        with FileStorage.__flush_lock:
+            with FileStorage.__lock:
+                if self.__shards:
+                    texts = self.__dump_shards()
+                else:
+                    texts = {self.__file_path:
+                             self.__dump(self.__objects.items())}
+                FileStorage.__dirty = set()
+                FileStorage.__dirty_shards = set()
+            for path, text in texts.items():
+                self.__write(path + ".tmp", text, 'w')
+                os.replace(path + ".tmp", path)
+            if os.path.exists(self.__file_path + ".journal"):
+                os.remove(self.__file_path + ".journal")
+            FileStorage.__journal_len = 0
+            FileStorage.__journal_offset = 0
+            self.__restamp(list(texts) + [self.__file_path + ".journal"])
+
+    def __append(self):
+        """appends the records changed since the last save to the journal"""
+        lines = []
+        with FileStorage.__lock:
+            for key in FileStorage.__dirty:
+                obj = self.__objects.get(key)
+                if obj is None:
+                    name, id = key.split(".", 1)
+                    record = {"__class__": name, "id": id,
+                              "__deleted__": True}
+                    lines.append(json.dumps(record) + "\n")
+                else:
+                    lines.append(self.__fragment(key, obj) + "\n")
+            FileStorage.__dirty = set()
+        if lines:
+            self.__write(self.__file_path + ".journal", "".join(lines), 'a')
+            FileStorage.__journal_len += len(lines)
+            self.__restamp([self.__file_path + ".journal"])
+            stamp = FileStorage.__stamps[self.__file_path + ".journal"]
+            FileStorage.__journal_offset = stamp[1]
+
+    def __stamp(self, path):
+        """returns the (mtime, size, inode) of path, or None if missing"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def __restamp(self, paths):
+        """records the current stamps of the files in paths"""
+        for path in paths:
+            FileStorage.__stamps[path] = self.__stamp(path)
+
+    def __snapshots(self):
+        """returns the paths of the files the objects are loaded from"""
+        if not self.__shards:
+            return [self.__file_path]
+        try:
+            names = sorted(os.listdir(self.__shard_dir()))
+        except OSError:
+            # not sharded yet: load the single file, the next
+            # compaction splits it into shards
+            return [self.__file_path]
+        return [os.path.join(self.__shard_dir(), name) for name in names
+                if not name.endswith(".tmp")]
+
+    def __snapshots_changed(self):
+        """tells if a file the objects are loaded from changed"""
+        paths = self.__snapshots()
+        if self.__shards:
+            known = [path for path, stamp in FileStorage.__stamps.items()
+                     if stamp is not None and
+                     os.path.dirname(path) == self.__shard_dir()]
+            if sorted(known) != [path for path in paths if
+                                 os.path.dirname(path) == self.__shard_dir()]:
+                return True
+        for path in paths:
+            if self.__stamp(path) != FileStorage.__stamps.get(path):
+                return True
+        return False
+
+    def __records(self, path, offset=0):
+        """yields (end offset, record, JSON text) for each line of path"""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete record")
+                offset += len(line)
+                yield offset, json.loads(line), line.decode().rstrip()
+
+    def __apply(self, record, text, journal=False):
+        """applies one upsert or tombstone record, returns its key
+
+        a journal record marks its shard for the next compaction, which
+        empties the journal. A key changed here and not saved yet keeps
+        its unsaved object, or stays deleted"""
+        key = record["__class__"] + "." + record["id"]
+        if journal and self.__shards:
+            FileStorage.__dirty_shards.add(self.__shard(key))
+        if key in FileStorage.__dirty:
+            return key
+        if record.get("__deleted__"):
+            self.__drop(key)
+            return key
+        cached = FileStorage.__fragments.get(key)
+        if cached is not None and cached[1] == text and \
+           self.__objects.get(key) is cached[0]:
+            return key
+        obj = classes[record["__class__"]](**record)
+        self.__put(key, obj)
+        FileStorage.__fragments[key] = (obj, text)
+        return key
+
+    def __replay(self, full=True):
+        """applies the journal records not applied yet on top of __objects"""
+        path = self.__file_path + ".journal"
+        if full:
+            FileStorage.__journal_len = 0
+            FileStorage.__journal_offset = 0
+        try:
+            for offset, record, text in self.__records(
+                    path, FileStorage.__journal_offset):
+                self.__apply(record, text, journal=True)
+                FileStorage.__journal_offset = offset
+                FileStorage.__journal_len += 1
+        except FileNotFoundError:
             pass
+        except ValueError:
+            if full:
+                # torn tail of an interrupted append: fold the records
+                # read so far into the JSON file
+                self.compact()
+                return
+        FileStorage.__stamps[path] = self.__stamp(path)
+
+    def reload(self):
+        """deserializes the JSON file and its journal to __objects"""
+        with FileStorage.__lock:
+            self.__load()
+
+    def __load(self, changed=False):
+        """applies the records of the JSON files, then replays the journal"""
+        path = self.__file_path
+        if self.__lines and not self.__shards and not os.path.exists(path):
+            legacy = os.path.splitext(path)[0] + ".json"
+            if os.path.exists(legacy):
+                self.convert(legacy, path)
+        paths = self.__snapshots()
+        if self.__shards:
+            for path, stamp in list(FileStorage.__stamps.items()):
+                if stamp is not None and path not in paths and \
+                   os.path.dirname(path) == self.__shard_dir():
+                    # shard removed since the last read
+                    FileStorage.__stamps[path] = None
+                    self.__drop_stale(path, set())
+        for path in paths:
+            stamp = self.__stamp(path)
+            if changed and stamp == FileStorage.__stamps.get(path):
+                continue
+            FileStorage.__stamps[path] = stamp
+            seen = self.__load_file(path)
+            if seen is not None:
+                self.__drop_stale(path, seen)
+        self.__replay()
+        self.__notify(None)
+
+    def __load_file(self, path):
+        """applies the records of one file, returns the keys it holds"""
+        if self.__lines:
+            seen = set()
+            try:
+                for offset, record, text in self.__records(path):
+                    seen.add(self.__apply(record, text))
+            except (OSError, ValueError):
+                return None
+            return seen
+        try:
+            with open(path, 'r') as f:
+                seen = json.load(f)
+            for key in seen:
+                self.__apply(seen[key], json.dumps(seen[key]))
+        except (OSError, ValueError):
+            return None
+        return seen
+
+    def __drop_stale(self, path, seen):
+        """drops the objects written to path before but no longer in it"""
+        if self.__shards:
+            name = os.path.basename(path).split(".")[0]
+            keys = [key for key in self.__index().get(name, {})
+                    if self.__shard(key) == path]
+        else:
+            keys = list(FileStorage.__fragments)
+        for key in keys:
+            if key not in seen and key not in FileStorage.__dirty and \
+               key in FileStorage.__fragments:
+                self.__drop(key)
+
+    def convert(self, src, dst):
+        """rewrites the JSON file src and its journal as JSON Lines in dst"""
+        with open(src, 'r') as f:
+            jo = json.load(f)
+        lines = [json.dumps(jo.pop(key)) + "\n" for key in list(jo)]
+        if os.path.exists(src + ".journal"):
+            with open(src + ".journal", 'r') as f:
+                lines.extend(line for line in f if line.endswith("\n"))
+        self.__write(dst + ".tmp", "".join(lines), 'w')
+        os.replace(dst + ".tmp", dst)
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with FileStorage.__lock:
+                if key not in self.__objects:
+                    return
+                self.__drop(key)
+                self.__mark(key)
+            self.__notify(obj, True)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """applies the changes other processes made to the files, if any"""
+        with FileStorage.__lock:
+            path = self.__file_path
+            journal = self.__stamp(path + ".journal")
+            seen = FileStorage.__stamps.get(path + ".journal")
+            if self.__snapshots_changed():
+                self.__load(changed=True)
+            elif journal == seen:
+                return
+            elif journal is None or seen is None or \
+                    journal[2] != seen[2] or \
+                    journal[1] < FileStorage.__journal_offset:
+                self.__load(changed=True)
+            else:
+                self.__replay(full=False)
+                self.__notify(None)
+
+    def get(self, cls, id):
+        """returns the object based on the class and its ID, or None"""
+        if cls is None or id is None:
+            return None
+        if type(cls) is not str:
+            cls = cls.__name__
+        return self.__index().get(cls, {}).get(cls + "." + id)
+
+    def get_many(self, cls, ids):
+        """returns the objects of the class with the given IDs, in their
+        order"""
+        if cls is None:
+            return []
+        if type(cls) is not str:
+            cls = cls.__name__
+        objs = self.__index().get(cls, {})
+        found = []
+        for id in dict.fromkeys(ids):
+            obj = objs.get(cls + "." + str(id))
+            if obj is not None:
+                found.append(obj)
+        return found
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns at most limit objects of the class in id order, from
+        the first id after the given one, only those whose foreign key
+        attr equals value if attr is given"""
+        if cls is None:
+            return []
+        if type(cls) is not str:
+            cls = cls.__name__
+        with FileStorage.__lock:
+            self.__index()
+            if attr is None:
+                name, objs = cls, self.__by_class.get(cls, {})
+            else:
+                name = (cls + "." + attr, value)
+                objs = self.__children.get(name[0], {}).get(value, {})
+            if not objs:
+                return []
+            ids = FileStorage.__sorted.get(name)
+            if ids is None:
+                ids = sorted(key.split(".", 1)[1] for key in objs)
+                FileStorage.__sorted[name] = ids
+            start = 0 if after is None else bisect.bisect_right(ids, after)
+            return [objs[cls + "." + id] for id in ids[start:start + limit]]
+
+    def count(self, cls=None):
+        """returns the number of objects in storage matching the class"""
+        if cls is None:
+            return len(self.__objects)
+        if type(cls) is not str:
+            cls = cls.__name__
+        return len(self.__index().get(cls, {}))
+
+    def related(self, cls, attr, id):
+        """returns the list of cls objects whose attribute attr equals id"""
+        if type(cls) is not str:
+            cls = cls.__name__
+        self.__index()
+        parents = self.__children.get(cls + "." + attr, {})
+        return list(parents.get(id, {}).values())
+
+    def changed(self, obj, attr, old):
+        """marks obj dirty and updates the indexes after obj.attr changed"""
+        if "id" not in obj.__dict__:
+            return
+        name = obj.__class__.__name__
+        key = name + "." + obj.id
+        if self.__objects.get(key) is not obj:
+            return
+        with FileStorage.__lock:
+            self.__mark(key)
+            if attr in relations.get(name, ()):
+                self.__index()
+                self.__unlink(key, obj, {attr: old})
+                self.__link(key, obj, (attr,))
+        self.__notify(obj)
+
+    def routes_reads(self):
+        """tells if reads may go to replicas: never, there is one file"""
+        return False
+
+    def subscribe(self, callback):
+        """calls callback(obj, deleted) after obj is added, changed or
+        deleted, and callback(None, False) when any object may have"""
+        FileStorage.__listeners.append(callback)
+
+    def __notify(self, obj, deleted=False):
+        """tells the listeners that obj changed"""
+        for callback in FileStorage.__listeners:
+            callback(obj, deleted)
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.base_model import Base
+from models.engine.db_storage import DBStorage, pool_options
+from os import getenv
+from sqlalchemy import create_engine, event
+
+
+class SQLiteStorage(DBStorage):
+    """interacts with an embedded SQLite database file"""
+
+    __engine = None
+    # list - engines of the replica files
+    __replicas = []
+
+    def _replicas(self):
+        """returns the paths of the replica database files"""
+        paths = getenv('HBNB_SQLITE_REPLICAS', '')
+        return [path.strip() for path in paths.split(',') if path.strip()]
+
+    def _create_engine(self, replica=None):
+        """returns the engine connected to the SQLite database file,
+        or to the replica file if given"""
+        HBNB_SQLITE_DB = replica or getenv('HBNB_SQLITE_DB', 'hbnb.db')
+        engine = create_engine('sqlite:///{}'.format(HBNB_SQLITE_DB),
+                               connect_args={"check_same_thread": False},
+                               **pool_options())
+        event.listen(engine, "connect", self.__on_connect)
+        if replica is None:
+            self.__engine = engine
+            self.__replicas = []
+        else:
+            self.__replicas.append(engine)
+        return engine
+
+    def __on_connect(self, dbapi_connection, connection_record):
+        """sets up every new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    def reload(self):
+        """creates the tables and their indexes, then a new session
+
+        Replica files get them too: nothing replicates the schema to
+        them, they only stand in for MySQL replicas"""
+        super().reload()
+        for engine in self.__replicas:
+            Base.metadata.create_all(engine)
+            self.migrate(engine)
@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+"""
+Contains the TestResponseCacheDocs and TestResponseCache classes
+"""
+
+from api.v1 import cache
+from flask import Flask, Response, jsonify
+import inspect
+import models
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+ResponseCache = cache.ResponseCache
+
+
+def listeners():
+    """returns the list of the storage listeners"""
+    if models.storage_t == 'db':
+        return models.storage._DBStorage__listeners
+    return models.storage._FileStorage__listeners
+
+
+class TestResponseCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of ResponseCache class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.cache_f = inspect.getmembers(ResponseCache, inspect.isfunction)
+
+    def test_pep8_conformance_cache(self):
+        """Test that api/v1/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_cache(self):
+        """Test that tests/test_api/test_v1/test_cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_module_docstring(self):
+        """Test for the cache.py module docstring"""
+        self.assertIsNot(cache.__doc__, None,
+                         "cache.py needs a docstring")
+        self.assertTrue(len(cache.__doc__) >= 1,
+                        "cache.py needs a docstring")
+
+    def test_cache_class_docstring(self):
+        """Test for the ResponseCache class docstring"""
+        self.assertIsNot(ResponseCache.__doc__, None,
+                         "ResponseCache class needs a docstring")
+        self.assertTrue(len(ResponseCache.__doc__) >= 1,
+                        "ResponseCache class needs a docstring")
+
+    def test_cache_func_docstrings(self):
+        """Test for the presence of docstrings in ResponseCache methods"""
+        for func in self.cache_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestTags(unittest.TestCase):
+    """Test what the cached responses are tagged with"""
+    def test_list(self):
+        """Test that a list depends on its class"""
+        self.assertEqual(cache.tags("/api/v1/states", {}), {"State"})
+
+    def test_object(self):
+        """Test that one object depends on its class name and id"""
+        self.assertEqual(cache.tags("/api/v1/states/a", {"state_id": "a"}),
+                         {("State", "a")})
+
+    def test_children(self):
+        """Test that the children of an object depend on their class"""
+        self.assertEqual(cache.tags("/api/v1/states/a/cities",
+                                    {"state_id": "a"}),
+                         {("State", "a"), "City"})
+
+    def test_anything(self):
+        """Test that the responses not tied to a class depend on anything"""
+        self.assertEqual(cache.tags("/api/v1/stats", {}), {"*"})
+        self.assertEqual(cache.tags("/api/v1/places_near", None), {"*"})
+        self.assertEqual(cache.tags("/api/v1/states/a/b", {"state_id": "a"}),
+                         {"*"})
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the ResponseCache class on a small app"""
+    def setUp(self):
+        """Serve a few routes counting how often they run"""
+        self.saved = listeners()[:]
+        self.serve(3, 1000)
+
+    def serve(self, max_entries, max_bytes):
+        """serves the routes through a new cache of the given bounds"""
+        self.calls = []
+        self.cache = ResponseCache(max_entries, max_bytes)
+        app = Flask(__name__)
+        app.before_request(self.cache.lookup)
+        app.after_request(self.cache.store)
+
+        @app.route('/api/v1/states')
+        def states():
+            """lists the states"""
+            self.calls.append("states")
+            return jsonify(["states"])
+
+        @app.route('/api/v1/states/<state_id>')
+        def state(state_id):
+            """shows one state"""
+            self.calls.append(state_id)
+            return jsonify({"id": state_id})
+
+        @app.route('/api/v1/cities')
+        def cities():
+            """lists the cities, writing to storage meanwhile"""
+            self.calls.append("cities")
+            self.cache.changed(City(), False)
+            return jsonify(["cities"])
+
+        @app.route('/api/v1/amenities')
+        def amenities():
+            """streams the amenities"""
+            self.calls.append("amenities")
+            return Response((chunk for chunk in ["[", '"a"', "]"]),
+                            mimetype="application/json")
+
+        @app.route('/api/v1/users')
+        def users():
+            """lists the users, too big to be kept"""
+            self.calls.append("users")
+            return jsonify(["x" * 1000])
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Unsubscribe the cache from storage"""
+        listeners()[:] = self.saved
+
+    def get(self, url):
+        """returns the body of the response to GET url"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.get_data()
+
+    def test_hit(self):
+        """Test that a second identical request is served from cache"""
+        self.assertEqual(self.get("/api/v1/states?a=1&b=2"), b'["states"]\n')
+        self.assertEqual(self.get("/api/v1/states?b=2&a=1"), b'["states"]\n')
+        self.assertEqual(self.calls, ["states"])
+        self.get("/api/v1/states")
+        self.assertEqual(self.calls, ["states", "states"])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]),
+                         (1, 2, 2))
+
+    def test_evicts_least_recently_used(self):
+        """Test that past max entries the least recently used goes"""
+        for url in ["a", "b", "c", "a", "d", "a", "b"]:
+            self.get("/api/v1/states/" + url)
+        self.assertEqual(self.calls, ["a", "b", "c", "d", "b"])
+        self.assertEqual(self.cache.stats()["evictions"], 2)
+        self.assertEqual(self.cache.stats()["entries"], 3)
+
+    def test_evicts_past_max_bytes(self):
+        """Test that the bodies are kept within max bytes"""
+        self.serve(10, 20)
+        for url in ["aaaa", "bbbb", "bbbb", "aaaa"]:
+            self.get("/api/v1/states/" + url)
+        self.assertEqual(self.calls, ["aaaa", "bbbb", "aaaa"])
+        self.assertLessEqual(self.cache.stats()["bytes"], 20)
+        self.assertEqual(self.cache.stats()["evictions"], 2)
+
+    def test_skips_bodies_bigger_than_max_bytes(self):
+        """Test that a body bigger than max bytes is not kept"""
+        self.get("/api/v1/users")
+        self.get("/api/v1/users")
+        self.assertEqual(self.calls, ["users", "users"])
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_invalidates_by_class_and_id(self):
+        """Test that a write drops the responses showing its object or
+        listing its class, and those only"""
+        for url in ["/api/v1/states", "/api/v1/states/a", "/api/v1/states/b"]:
+            self.get(url)
+        self.cache.changed(City(), False)
+        self.assertEqual(self.cache.stats()["entries"], 3)
+        self.cache.changed(State(id="a"), False)
+        self.assertEqual(self.cache.stats()["invalidations"], 2)
+        for url in ["/api/v1/states", "/api/v1/states/a", "/api/v1/states/b"]:
+            self.get(url)
+        self.assertEqual(self.calls, ["states", "a", "b", "states", "a"])
+        self.cache.changed(None, False)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_skips_responses_built_across_a_write(self):
+        """Test that a response is not kept if storage changed while it
+        was built"""
+        self.get("/api/v1/cities")
+        self.get("/api/v1/cities")
+        self.assertEqual(self.calls, ["cities", "cities"])
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_captures_streamed_response(self):
+        """Test that a streamed body is kept once fully sent"""
+        response = self.client.get("/api/v1/amenities")
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.get_data(), b'["a"]')
+        self.assertEqual(self.get("/api/v1/amenities"), b'["a"]')
+        self.assertEqual(self.calls, ["amenities"])
+
+    def test_skips_while_reading_replicas(self):
+        """Test that nothing is kept while reads may go to replicas"""
+        with mock.patch.object(models.storage, "routes_reads",
+                               return_value=True):
+            self.get("/api/v1/states")
+            self.get("/api/v1/states")
+        self.assertEqual(self.calls, ["states", "states"])
+
+    def test_disabled(self):
+        """Test that a cache of no entries keeps nothing"""
+        disabled = ResponseCache(0, 1000)
+        self.assertFalse(disabled.enabled)
+        self.assertTrue(self.cache.enabled)
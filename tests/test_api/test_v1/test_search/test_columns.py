@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+"""
+Contains the TestColumnsDocs, TestCheckRanges and TestPlaceColumns classes
+"""
+
+from api.v1.app import app
+from api.v1.search import columns
+import inspect
+import math
+from models.place import Place
+import pep8
+import unittest
+from unittest import mock
+PlaceColumns = columns.PlaceColumns
+
+
+class TestColumnsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of PlaceColumns class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.columns_f = inspect.getmembers(PlaceColumns, inspect.isfunction)
+
+    def test_pep8_conformance_columns(self):
+        """Test that api/v1/search/columns.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/search/columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_columns(self):
+        """Test that tests/test_api/test_v1/test_search/test_columns.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_search/\
+test_columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_columns_module_docstring(self):
+        """Test for the columns.py module docstring"""
+        self.assertIsNot(columns.__doc__, None,
+                         "columns.py needs a docstring")
+        self.assertTrue(len(columns.__doc__) >= 1,
+                        "columns.py needs a docstring")
+
+    def test_columns_class_docstring(self):
+        """Test for the PlaceColumns class docstring"""
+        self.assertIsNot(PlaceColumns.__doc__, None,
+                         "PlaceColumns class needs a docstring")
+        self.assertTrue(len(PlaceColumns.__doc__) >= 1,
+                        "PlaceColumns class needs a docstring")
+
+    def test_columns_func_docstrings(self):
+        """Test for the presence of docstrings in PlaceColumns methods"""
+        for func in self.columns_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestCheckRanges(unittest.TestCase):
+    """Test the validation of the ranges of places_search"""
+    invalid = [[], {"size": [1, 2]}, {"max_guest": 2},
+               {"max_guest": [1]}, {"max_guest": [1, 2, 3]},
+               {"max_guest": ["1", None]}, {"max_guest": [True, None]},
+               {"max_guest": [None, False]}]
+
+    def test_valid(self):
+        """Test that ranges come back as (min, max) by field"""
+        self.assertEqual(columns.check_ranges({}), {})
+        self.assertEqual(columns.check_ranges({"max_guest": [1, None],
+                                               "latitude": [None, 2.5]}),
+                         {"max_guest": (1, None), "latitude": (None, 2.5)})
+
+    def test_invalid(self):
+        """Test that unknown fields and bad bounds raise ValueError"""
+        for ranges in self.invalid + [{"max_guest": (1, 2)}]:
+            with self.subTest(ranges=ranges):
+                with self.assertRaises(ValueError):
+                    columns.check_ranges(ranges)
+
+    def test_places_search_rejects(self):
+        """Test that places_search answers 400 to invalid ranges"""
+        client = app.test_client()
+        for ranges in self.invalid:
+            with self.subTest(ranges=ranges):
+                response = client.post("/api/v1/places_search",
+                                       json={"ranges": ranges})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.get_json())
+        response = client.post("/api/v1/places_search",
+                               json={"ranges": {"size": [1, 2]}})
+        self.assertEqual(response.get_json(),
+                         {"error": "Unknown range field: size"})
+
+    def test_number(self):
+        """Test that values which are not numbers become NaN"""
+        self.assertEqual(columns.number("3"), 3.0)
+        self.assertEqual(columns.number(2), 2.0)
+        for value in [None, "abc", [], {}]:
+            self.assertTrue(math.isnan(columns.number(value)))
+
+
+class TestPlaceColumns(unittest.TestCase):
+    """Test the PlaceColumns class over a mocked storage"""
+    def setUp(self):
+        """Build the columns over a storage holding two places"""
+        self.places = [Place(max_guest=2, price_by_night=100),
+                       Place(max_guest=4, price_by_night=250)]
+        patch = mock.patch.object(columns, "storage")
+        storage = patch.start()
+        storage.all.return_value = {"Place." + place.id: place
+                                    for place in self.places}
+        self.addCleanup(patch.stop)
+        self.columns = PlaceColumns()
+
+    def found(self, ranges):
+        """returns the set of place ids within ranges"""
+        ids = self.columns.places(ranges)
+        self.assertEqual(len(ids), len(set(ids)))
+        return set(ids)
+
+    def test_ranges(self):
+        """Test that both bounds are inclusive and either may be null"""
+        first, second = [place.id for place in self.places]
+        self.assertEqual(self.found({}), {first, second})
+        self.assertEqual(self.found({"max_guest": [2, 2]}), {first})
+        self.assertEqual(self.found({"max_guest": [3, None]}), {second})
+        self.assertEqual(self.found({"max_guest": [None, 4],
+                                     "price_by_night": [101, None]}),
+                         {second})
+        self.assertEqual(self.found({"max_guest": [5, None]}), set())
+
+    def test_not_a_number(self):
+        """Test that a value which is not a number matches no bound"""
+        place = Place(max_guest="many", price_by_night=10)
+        self.columns.places({})
+        self.columns.changed(place, False)
+        self.assertIn(place.id, self.found({}))
+        self.assertIn(place.id, self.found({"price_by_night": [0, 10]}))
+        self.assertNotIn(place.id, self.found({"max_guest": [None, 100]}))
+        self.assertNotIn(place.id, self.found({"max_guest": [0, None]}))
+
+    def test_create_update_delete(self):
+        """Test that the writes to places move them between ranges"""
+        for numpy in [columns.numpy, None]:
+            with self.subTest(numpy=numpy), \
+                    mock.patch.object(columns, "numpy", numpy):
+                self.columns = PlaceColumns()
+                self.check_create_update_delete()
+
+    def check_create_update_delete(self):
+        """creates, updates and deletes a place through changed()"""
+        self.columns.places({})
+        place = Place(max_guest=8)
+        self.columns.changed(place, False)
+        self.assertEqual(self.found({"max_guest": [8, None]}), {place.id})
+        place.max_guest = 1
+        self.columns.changed(place, False)
+        self.assertEqual(self.found({"max_guest": [8, None]}), set())
+        self.assertEqual(self.found({"max_guest": [None, 1]}), {place.id})
+        self.columns.changed(place, True)
+        self.assertNotIn(place.id, self.found({}))
+        self.assertEqual(self.found({"max_guest": [None, 1]}), set())
+        self.columns.changed(Place(max_guest=8), True)
+        self.assertEqual(len(self.found({})), 2)
+
+    def test_reuses_freed_rows(self):
+        """Test that a new place takes the row of a deleted one"""
+        self.columns.places({})
+        size = len(self.columns._PlaceColumns__ids)
+        row = self.columns._PlaceColumns__rows[self.places[0].id]
+        self.columns.changed(self.places[0], True)
+        place = Place(max_guest=3)
+        self.columns.changed(place, False)
+        self.assertEqual(self.columns._PlaceColumns__rows[place.id], row)
+        self.assertEqual(len(self.columns._PlaceColumns__ids), size)
+        self.assertEqual(self.found({"max_guest": [3, 3]}), {place.id})
+
+    def test_grows_columns(self):
+        """Test that the columns grow as places are added"""
+        self.columns.places({})
+        added = [Place(max_guest=i) for i in range(40)]
+        for place in added:
+            self.columns.changed(place, False)
+        values = self.columns._PlaceColumns__columns["max_guest"]
+        self.assertGreaterEqual(len(values), 42)
+        if columns.numpy is not None:
+            self.assertIsInstance(values, columns.numpy.ndarray)
+            self.assertTrue(math.isnan(values[-1]))
+        self.assertEqual(self.found({"max_guest": [10, 19]}),
+                         set(place.id for place in added[10:20]))
+        self.assertEqual(len(self.found({})), 42)
+
+    def test_reset(self):
+        """Test that a reset rebuilds the columns from storage"""
+        self.columns.places({})
+        self.columns.changed(Place(max_guest=8), False)
+        self.columns.changed(None, False)
+        self.assertEqual(self.found({}),
+                         set(place.id for place in self.places))
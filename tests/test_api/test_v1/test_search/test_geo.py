@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeoDocs, TestPlaceGrid and TestPlacesNear classes
+"""
+
+from api.v1.app import app
+from api.v1.search import geo
+import inspect
+import models
+from models.engine.db_storage import DBStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import random
+import unittest
+from unittest import mock
+PlaceGrid = geo.PlaceGrid
+
+
+class TestGeoDocs(unittest.TestCase):
+    """Tests to check the documentation and style of PlaceGrid class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.geo_f = inspect.getmembers(PlaceGrid, inspect.isfunction)
+
+    def test_pep8_conformance_geo(self):
+        """Test that api/v1/search/geo.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/search/geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_geo(self):
+        """Test that tests/test_api/test_v1/test_search/test_geo.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_search/\
+test_geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_geo_module_docstring(self):
+        """Test for the geo.py module docstring"""
+        self.assertIsNot(geo.__doc__, None,
+                         "geo.py needs a docstring")
+        self.assertTrue(len(geo.__doc__) >= 1,
+                        "geo.py needs a docstring")
+
+    def test_geo_class_docstring(self):
+        """Test for the PlaceGrid class docstring"""
+        self.assertIsNot(PlaceGrid.__doc__, None,
+                         "PlaceGrid class needs a docstring")
+        self.assertTrue(len(PlaceGrid.__doc__) >= 1,
+                        "PlaceGrid class needs a docstring")
+
+    def test_geo_func_docstrings(self):
+        """Test for the presence of docstrings in PlaceGrid methods"""
+        for func in self.geo_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestPlaceGrid(unittest.TestCase):
+    """Test the PlaceGrid class against a full scan"""
+    def setUp(self):
+        """Build a new grid over an empty storage"""
+        patch = mock.patch.object(geo, "storage")
+        patch.start().all.return_value = {}
+        self.addCleanup(patch.stop)
+        self.grid = PlaceGrid()
+
+    def point(self, rng):
+        """returns a random point, often near a pole or the antimeridian"""
+        kind = rng.randrange(3)
+        lat = rng.uniform(-90, 90)
+        lng = rng.uniform(-180, 180)
+        if kind == 1:
+            lng = rng.choice([1, -1]) * rng.uniform(179, 180)
+        elif kind == 2:
+            lat = rng.choice([1, -1]) * rng.uniform(88, 90)
+        return lat, lng
+
+    def test_near_matches_full_scan(self):
+        """Test that near returns what a full scan finds, nearest first"""
+        rng = random.Random(15)
+        self.grid.near(0, 0, 1, 1)
+        points = {}
+        for i in range(600):
+            lat, lng = self.point(rng)
+            place = Place(latitude=lat, longitude=lng)
+            self.grid.changed(place, False)
+            points[place.id] = (lat, lng)
+        ids = list(points)
+        for numpy in [geo.numpy, None]:
+            with mock.patch.object(geo, "numpy", numpy):
+                self.check_near(rng, points, ids)
+
+    def check_near(self, rng, points, ids):
+        """compares near with a full scan of points around random spots"""
+        for i in range(100):
+            lat, lng = self.point(rng)
+            radius = rng.choice([1, 10, 100, 500, 2000, 10000, 20100])
+            distances = geo.haversine(lat, lng,
+                                      [points[id][0] for id in ids],
+                                      [points[id][1] for id in ids])
+            expected = sorted((float(distance), id)
+                              for distance, id in zip(distances, ids)
+                              if distance <= radius)
+            found = [(distance, id) for distance, id in
+                     self.grid.near(lat, lng, radius, len(ids) + 1000)
+                     if id in points]
+            self.assertEqual([id for distance, id in found],
+                             [id for distance, id in expected],
+                             (lat, lng, radius))
+
+    def test_limit(self):
+        """Test that near keeps only the nearest limit places"""
+        self.grid.near(0, 0, 1, 1)
+        places = [Place(latitude=0, longitude=i / 100) for i in range(5)]
+        for place in places:
+            self.grid.changed(place, False)
+        found = self.grid.near(0, 0, 10, 2)
+        self.assertEqual([id for distance, id in found],
+                         [places[0].id, places[1].id])
+
+    def test_location(self):
+        """Test that only coordinates in range make a location"""
+        self.assertEqual(geo.location(Place(latitude=0, longitude=0)),
+                         (0.0, 0.0))
+        self.assertIsNone(geo.location(Place()))
+        self.assertIsNone(geo.location(Place(latitude=0)))
+        self.assertIsNone(geo.location(Place(latitude=91, longitude=0)))
+
+
+class TestPlacesNear(unittest.TestCase):
+    """Test the /places_near endpoint"""
+    def setUp(self):
+        """Create a state, a city and a user to hang places on"""
+        self.state = State(name="California")
+        self.city = City(name="Fremont", state_id=self.state.id)
+        self.user = User(email="a@b.c", password="pwd")
+        self.created = [self.state, self.city, self.user]
+        for obj in self.created:
+            models.storage.new(obj)
+        models.storage.save()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Delete the objects created"""
+        for obj in reversed(self.created):
+            models.storage.delete(models.storage.get(type(obj), obj.id))
+        models.storage.save()
+
+    def add(self, **kwargs):
+        """saves a new place in the city, deleted by tearDown"""
+        place = Place(name="Loft", city_id=self.city.id,
+                      user_id=self.user.id, **kwargs)
+        models.storage.new(place)
+        models.storage.save()
+        self.created.append(place)
+        return place
+
+    def near(self, lat, lng, radius_km):
+        """returns the ids of the places near (lat, lng)"""
+        response = self.client.get(
+            "/api/v1/places_near?lat={}&lng={}&radius_km={}&limit=1000"
+            .format(lat, lng, radius_km))
+        self.assertEqual(response.status_code, 200)
+        return [place["id"] for place in response.get_json()]
+
+    def test_no_location(self):
+        """Test that a place without coordinates is not at (0, 0)"""
+        nowhere = self.add()
+        origin = self.add(latitude=0, longitude=0)
+        near = self.near(0, 0, 10)
+        self.assertIn(origin.id, near)
+        self.assertNotIn(nowhere.id, near)
+
+    def test_put_moves_place(self):
+        """Test that a Place PUT moves it to the cell of its location"""
+        place = self.add(latitude=10, longitude=10)
+        self.assertIn(place.id, self.near(10, 10, 1))
+        response = self.client.put(
+            "/api/v1/places/" + place.id,
+            json={"latitude": -40, "longitude": 179.99})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(place.id, self.near(10, 10, 1))
+        self.assertIn(place.id, self.near(-40, -179.99, 5))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_other_writers(self):
+        """Test that the places other processes write show up after the
+        next resync"""
+        self.near(0, 0, 10)
+        with mock.patch.object(DBStorage, "_DBStorage__listeners", []):
+            other = type(models.storage)()
+            other.reload()
+            place = Place(name="Loft", city_id=self.city.id,
+                          user_id=self.user.id, latitude=0, longitude=0)
+            other.new(place)
+            other.save()
+        try:
+            self.assertNotIn(place.id, self.near(0, 0, 10))
+            with mock.patch.object(models.storage, "_DBStorage__resync", 0):
+                models.storage.close()
+            self.assertIn(place.id, self.near(0, 0, 10))
+        finally:
+            with mock.patch.object(DBStorage, "_DBStorage__listeners", []):
+                other.delete(place)
+                other.save()
+                other.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""
+Contains the TestNamesDocs, TestNameIndex and TestAutocomplete classes
+"""
+
+from api.v1.app import app
+from api.v1.search import names
+import inspect
+import models
+from models.city import City
+from models.engine.db_storage import DBStorage
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+NameIndex = names.NameIndex
+
+
+def listeners():
+    """returns the list of the storage listeners"""
+    if models.storage_t == 'db':
+        return models.storage._DBStorage__listeners
+    return models.storage._FileStorage__listeners
+
+
+class TestNamesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of NameIndex class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.names_f = inspect.getmembers(NameIndex, inspect.isfunction)
+
+    def test_pep8_conformance_names(self):
+        """Test that api/v1/search/names.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/search/names.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_names(self):
+        """Test that tests/test_api/test_v1/test_search/test_names.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_search/\
+test_names.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_names_module_docstring(self):
+        """Test for the names.py module docstring"""
+        self.assertIsNot(names.__doc__, None,
+                         "names.py needs a docstring")
+        self.assertTrue(len(names.__doc__) >= 1,
+                        "names.py needs a docstring")
+
+    def test_names_class_docstring(self):
+        """Test for the NameIndex class docstring"""
+        self.assertIsNot(NameIndex.__doc__, None,
+                         "NameIndex class needs a docstring")
+        self.assertTrue(len(NameIndex.__doc__) >= 1,
+                        "NameIndex class needs a docstring")
+
+    def test_names_func_docstrings(self):
+        """Test for the presence of docstrings in NameIndex methods"""
+        for func in self.names_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class NamesTestCase(unittest.TestCase):
+    """Creates states and cities with names sharing a rare prefix"""
+    def setUp(self):
+        """Create the states and the city"""
+        self.saved = listeners()[:]
+        self.created = []
+        self.qqxa = self.add(State(name="Qqxa"))
+        self.qqxab = self.add(State(name="Qqxab"))
+        self.qqxac = self.add(City(name="Qqxac", state_id=self.qqxa.id))
+        self.qqxb = self.add(State(name="Qqxb"))
+        self.quebec = self.add(State(name="Qqx Québec"))
+
+    def tearDown(self):
+        """Delete the objects created and unsubscribe the indexes"""
+        listeners()[:] = self.saved
+        for obj in reversed(self.created):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def add(self, obj):
+        """saves obj, deleted by tearDown, returns it"""
+        models.storage.new(obj)
+        models.storage.save()
+        self.created.append(obj)
+        return obj
+
+
+class TestNameIndex(NamesTestCase):
+    """Test the NameIndex class against storage"""
+    def setUp(self):
+        """Subscribe a new index"""
+        super().setUp()
+        self.index = NameIndex()
+
+    def names(self, prefix, limit=10, classes=names.named):
+        """returns the names completing prefix"""
+        return [name for cls, id, name in
+                self.index.complete(prefix, limit, classes)]
+
+    def test_prefix_boundaries(self):
+        """Test that the names starting with the prefix come in order"""
+        self.assertEqual(self.names("qqxa"), ["Qqxa", "Qqxab", "Qqxac"])
+        self.assertEqual(self.names("qqxa", 2), ["Qqxa", "Qqxab"])
+        self.assertEqual(self.names("qqxab"), ["Qqxab"])
+        self.assertEqual(self.names("qqxc"), [])
+        self.assertEqual(self.names("qqx"), ["Qqx Québec", "Qqxa", "Qqxab",
+                                             "Qqxac", "Qqxb"])
+
+    def test_normalization(self):
+        """Test that case and accents are ignored"""
+        self.assertEqual(self.names("QQX QUE"), ["Qqx Québec"])
+        self.assertEqual(self.names("qqx québ"), ["Qqx Québec"])
+
+    def test_classes(self):
+        """Test that only the classes asked for are returned"""
+        found = self.index.complete("qqxa", 10, ("City",))
+        self.assertEqual(found, [("City", self.qqxac.id, "Qqxac")])
+
+    def test_rename_and_delete(self):
+        """Test that renames and deletes update the entries"""
+        self.assertEqual(self.names("qqxa"), ["Qqxa", "Qqxab", "Qqxac"])
+        self.qqxab.name = "Qqxz"
+        self.qqxab.save()
+        self.assertEqual(self.names("qqxa"), ["Qqxa", "Qqxac"])
+        self.assertEqual(self.names("qqxz"), ["Qqxz"])
+        models.storage.delete(self.qqxac)
+        models.storage.save()
+        self.created.remove(self.qqxac)
+        self.assertEqual(self.names("qqxa"), ["Qqxa"])
+        self.assertFalse(self.index._NameIndex__stale)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_other_writers(self):
+        """Test that the names other processes write complete after the
+        next resync"""
+        self.assertEqual(self.names("qqxa"), ["Qqxa", "Qqxab", "Qqxac"])
+        with mock.patch.object(DBStorage, "_DBStorage__listeners", []):
+            other = type(models.storage)()
+            other.reload()
+            state = State(name="Qqxad")
+            other.new(state)
+            other.save()
+        try:
+            self.assertEqual(self.names("qqxad"), [])
+            with mock.patch.object(models.storage, "_DBStorage__resync", 0):
+                models.storage.close()
+            self.assertEqual(self.names("qqxad"), ["Qqxad"])
+        finally:
+            with mock.patch.object(DBStorage, "_DBStorage__listeners", []):
+                other.delete(state)
+                other.save()
+                other.close()
+
+
+class TestAutocomplete(NamesTestCase):
+    """Test the /autocomplete endpoint"""
+    def setUp(self):
+        """Create a test client"""
+        super().setUp()
+        self.client = app.test_client()
+
+    def test_autocomplete(self):
+        """Test that the matches come as class, id and name"""
+        response = self.client.get("/api/v1/autocomplete?prefix=qqxa")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0], {
+            "__class__": "State", "id": self.qqxa.id, "name": "Qqxa"})
+        self.assertEqual(len(response.get_json()), 3)
+
+    def test_type(self):
+        """Test that type keeps the matches of one class"""
+        response = self.client.get(
+            "/api/v1/autocomplete?prefix=qqx&type=City")
+        self.assertEqual([match["name"] for match in response.get_json()],
+                         ["Qqxac"])
+        response = self.client.get(
+            "/api/v1/autocomplete?prefix=qqx&type=Place")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid(self):
+        """Test that a missing prefix or a bad limit are rejected"""
+        self.assertEqual(self.client.get(
+            "/api/v1/autocomplete").status_code, 400)
+        self.assertEqual(self.client.get(
+            "/api/v1/autocomplete?prefix=q&limit=0").status_code, 400)
+        response = self.client.get("/api/v1/autocomplete?prefix=qqx&limit=2")
+        self.assertEqual(len(response.get_json()), 2)
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesDocs and TestSearchPlaces classes
+"""
+
+from api.v1.search import places, search_places
+import inspect
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import random
+import unittest
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of search/places.py"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.places_f = inspect.getmembers(places, inspect.isfunction)
+
+    def test_pep8_conformance_places(self):
+        """Test that api/v1/search/places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/search/places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_places(self):
+        """Test that tests/test_api/test_v1/test_search/test_places.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_search/\
+test_places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_module_docstring(self):
+        """Test for the places.py module docstring"""
+        self.assertIsNot(places.__doc__, None,
+                         "places.py needs a docstring")
+        self.assertTrue(len(places.__doc__) >= 1,
+                        "places.py needs a docstring")
+
+    def test_places_func_docstrings(self):
+        """Test for the presence of docstrings in places.py functions"""
+        for func in self.places_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSearchPlaces(unittest.TestCase):
+    """Test search_places against a scan of every place"""
+    @classmethod
+    def setUpClass(cls):
+        """Create random states, cities, amenities and places"""
+        rng = random.Random(11)
+        user = User(email="a@b.c", password="pwd")
+        cls.states = [State(name="State {}".format(i)) for i in range(4)]
+        cls.cities = [City(name="City {}".format(i),
+                           state_id=rng.choice(cls.states).id)
+                      for i in range(10)]
+        cls.amenities = [Amenity(name="Amenity {}".format(i))
+                         for i in range(5)]
+        cls.places = []
+        for i in range(60):
+            place = Place(name="Place {}".format(i), user_id=user.id,
+                          city_id=rng.choice(cls.cities).id,
+                          number_rooms=rng.randrange(6),
+                          price_by_night=rng.randrange(300))
+            for amenity in rng.sample(cls.amenities, rng.randrange(4)):
+                if models.storage_t == 'db':
+                    place.amenities.append(amenity)
+                else:
+                    place.amenities = amenity
+            cls.places.append(place)
+        cls.created = [user] + cls.states + cls.cities + cls.amenities + \
+            cls.places
+        for obj in cls.created:
+            models.storage.new(obj)
+        models.storage.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Delete the objects created"""
+        for obj in reversed(cls.created):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def scan(self, states, cities, amenities, ranges):
+        """returns the ids of the created places search_places should
+        return, found by scanning every one of them"""
+        city_ids = set(cities) | set(city.id for city in self.cities
+                                     if city.state_id in states)
+        required = set(amenities) & set(a.id for a in self.amenities)
+        found = set()
+        for place in self.places:
+            if (states or cities) and place.city_id not in city_ids:
+                continue
+            if not required <= set(a.id for a in place.amenities):
+                continue
+            if not all((low is None or getattr(place, field) >= low) and
+                       (high is None or getattr(place, field) <= high)
+                       for field, (low, high) in ranges.items()):
+                continue
+            found.add(place.id)
+        return found
+
+    def search(self, states, cities, amenities, ranges):
+        """returns the ids of the created places search_places returns"""
+        created = set(place.id for place in self.places)
+        ids = [place.id for place in
+               search_places(states, cities, amenities, ranges)]
+        self.assertEqual(len(ids), len(set(ids)))
+        return set(ids) & created
+
+    def ids(self, objs, rng):
+        """returns the ids of a random sample of objs and an unknown id"""
+        ids = [obj.id for obj in rng.sample(objs, rng.randrange(3))]
+        if rng.random() < 0.3:
+            ids.append("unknown")
+        return ids
+
+    def test_matches_scan(self):
+        """Test that random searches match the scan"""
+        rng = random.Random(111)
+        for i in range(200):
+            states = self.ids(self.states, rng)
+            cities = self.ids(self.cities, rng)
+            amenities = self.ids(self.amenities, rng)
+            ranges = {}
+            if rng.random() < 0.3:
+                ranges["number_rooms"] = [rng.randrange(3), None]
+            if rng.random() < 0.3:
+                ranges["price_by_night"] = [None, rng.randrange(300)]
+            self.assertEqual(self.search(states, cities, amenities, ranges),
+                             self.scan(states, cities, amenities, ranges),
+                             (states, cities, amenities, ranges))
+
+    def test_states_expand_to_cities(self):
+        """Test that a state brings the places of all its cities"""
+        state = self.states[0]
+        expected = set(place.id for place in self.places
+                       if place.city_id in [city.id for city in self.cities
+                                            if city.state_id == state.id])
+        self.assertEqual(self.search([state.id], [], [], {}), expected)
+
+    def test_unknown_ids_are_skipped(self):
+        """Test that unknown ids neither match nor fail"""
+        self.assertEqual(self.search(["unknown"], ["unknown"], [], {}),
+                         set())
+        self.assertEqual(self.search([], [], ["unknown"], {}),
+                         set(place.id for place in self.places))
+
+    def test_amenities_all_required(self):
+        """Test that a place must have every amenity listed"""
+        pair = [self.amenities[0].id, self.amenities[1].id]
+        expected = set(place.id for place in self.places
+                       if set(pair) <= set(a.id for a in place.amenities))
+        self.assertEqual(self.search([], [], pair, {}), expected)
@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+"""
+Contains the TestTextDocs, TestTokenize and TestTextIndex classes
+"""
+
+from api.v1.search import search_places, text
+import inspect
+import models
+from models.city import City
+from models.engine.db_storage import DBStorage
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import os
+import pep8
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+TextIndex = text.TextIndex
+
+
+def listeners():
+    """returns the list of the storage listeners"""
+    if models.storage_t == 'db':
+        return models.storage._DBStorage__listeners
+    return models.storage._FileStorage__listeners
+
+
+class TestTextDocs(unittest.TestCase):
+    """Tests to check the documentation and style of TextIndex class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.text_f = inspect.getmembers(TextIndex, inspect.isfunction)
+
+    def test_pep8_conformance_text(self):
+        """Test that api/v1/search/text.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/search/text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_text(self):
+        """Test that tests/test_api/test_v1/test_search/test_text.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_search/\
+test_text.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_text_module_docstring(self):
+        """Test for the text.py module docstring"""
+        self.assertIsNot(text.__doc__, None,
+                         "text.py needs a docstring")
+        self.assertTrue(len(text.__doc__) >= 1,
+                        "text.py needs a docstring")
+
+    def test_text_class_docstring(self):
+        """Test for the TextIndex class docstring"""
+        self.assertIsNot(TextIndex.__doc__, None,
+                         "TextIndex class needs a docstring")
+        self.assertTrue(len(TextIndex.__doc__) >= 1,
+                        "TextIndex class needs a docstring")
+
+    def test_text_func_docstrings(self):
+        """Test for the presence of docstrings in TextIndex methods"""
+        for func in self.text_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestTokenize(unittest.TestCase):
+    """Test the normalization of the indexed text"""
+    def test_normalize(self):
+        """Test that normalize lowercases and strips accents"""
+        self.assertEqual(text.normalize("Café ÉTÉ"), "cafe ete")
+        self.assertEqual(text.normalize(None), "")
+
+    def test_tokenize(self):
+        """Test that tokenize splits words and drops stopwords"""
+        self.assertEqual(text.tokenize("The Café, at the beach!"),
+                         ["cafe", "beach"])
+        self.assertEqual(text.tokenize("the a of"), [])
+        self.assertEqual(text.tokenize(None), [])
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class against storage"""
+    def setUp(self):
+        """Create a city and a user to hang places on"""
+        self.saved = listeners()[:]
+        self.created = []
+        state = self.add(State(name="California"))
+        self.city = self.add(City(name="Fremont", state_id=state.id))
+        self.user = self.add(User(email="a@b.c", password="pwd"))
+        self.loft = self.add(Place(name="Marzipan loft", city_id=self.city.id,
+                                   user_id=self.user.id))
+        self.cabin = self.add(Place(name="Cabin", city_id=self.city.id,
+                                    user_id=self.user.id,
+                                    description="near the marzipan shop"))
+        self.index = TextIndex()
+
+    def tearDown(self):
+        """Delete the objects created and unsubscribe the indexes"""
+        listeners()[:] = self.saved
+        for obj in reversed(self.created):
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def add(self, obj):
+        """saves obj, deleted by tearDown, returns it"""
+        models.storage.new(obj)
+        models.storage.save()
+        self.created.append(obj)
+        return obj
+
+    def test_ranking(self):
+        """Test that words in the name weigh more and all words match"""
+        scores = self.index.scores("marzipan")
+        self.assertGreater(scores[self.loft.id], scores[self.cabin.id])
+        scores = self.index.scores("Marzipan LOFT")
+        self.assertIn(self.loft.id, scores)
+        self.assertNotIn(self.cabin.id, scores)
+
+    def test_no_words(self):
+        """Test that a q without words filters nothing"""
+        self.assertIsNone(self.index.scores(""))
+        self.assertIsNone(self.index.scores("the of"))
+        everything = set(place.id for place in search_places([], [], []))
+        self.assertIn(self.loft.id, everything)
+        for q in ["", "the"]:
+            self.assertEqual(set(place.id for place in
+                                 search_places([], [], [], {}, q)),
+                             everything)
+
+    def test_incremental_updates(self):
+        """Test that writes to places and reviews update the postings"""
+        self.assertNotIn(self.cabin.id, self.index.scores("gondola"))
+        review = self.add(Review(text="Gondola ride", place_id=self.cabin.id,
+                                 user_id=self.user.id))
+        self.assertIn(self.cabin.id, self.index.scores("gondola"))
+        self.loft.name = "Plain loft"
+        self.loft.save()
+        self.assertNotIn(self.loft.id, self.index.scores("marzipan"))
+        self.assertIn(self.loft.id, self.index.scores("plain"))
+        models.storage.delete(review)
+        models.storage.save()
+        self.created.remove(review)
+        self.assertNotIn(self.cabin.id, self.index.scores("gondola"))
+        self.assertFalse(self.index._TextIndex__stale)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_other_writers(self):
+        """Test that the reviews other processes write are found after
+        the next resync"""
+        self.assertNotIn(self.cabin.id, self.index.scores("gondola"))
+        with mock.patch.object(DBStorage, "_DBStorage__listeners", []):
+            other = type(models.storage)()
+            other.reload()
+            review = Review(text="Gondola ride", place_id=self.cabin.id,
+                            user_id=self.user.id)
+            other.new(review)
+            other.save()
+        try:
+            self.assertNotIn(self.cabin.id, self.index.scores("gondola"))
+            with mock.patch.object(models.storage, "_DBStorage__resync", 0):
+                models.storage.close()
+            self.assertIn(self.cabin.id, self.index.scores("gondola"))
+        finally:
+            with mock.patch.object(DBStorage, "_DBStorage__listeners", []):
+                other.delete(review)
+                other.save()
+                other.close()
+
+    def test_persisted_reload(self):
+        """Test that a saved index is reused without tokenizing again"""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "text.json")
+        try:
+            index = TextIndex(path)
+            scores = index.scores("marzipan")
+            index.save()
+            self.assertTrue(os.path.exists(path))
+            reloaded = TextIndex(path)
+            with mock.patch.object(text, "tokenize",
+                                   wraps=text.tokenize) as tokenize:
+                self.assertEqual(reloaded.scores("marzipan"), scores)
+            self.assertEqual(tokenize.call_count, 1)
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagesDocs and TestStreamResponse classes
+"""
+
+from api.v1.app import app
+from api.v1.views import pages
+from flask import jsonify
+import inspect
+import json
+import models
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestPagesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of views/pages.py"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.pages_f = inspect.getmembers(pages, inspect.isfunction)
+
+    def test_pep8_conformance_pages(self):
+        """Test that api/v1/views/pages.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/pages.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_pages(self):
+        """Test that tests/test_api/test_v1/test_views/test_pages.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_pages.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pages_module_docstring(self):
+        """Test for the pages.py module docstring"""
+        self.assertIsNot(pages.__doc__, None,
+                         "pages.py needs a docstring")
+        self.assertTrue(len(pages.__doc__) >= 1,
+                        "pages.py needs a docstring")
+
+    def test_pages_func_docstrings(self):
+        """Test for the presence of docstrings in pages.py functions"""
+        for func in self.pages_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestStreamResponse(unittest.TestCase):
+    """Test the streamed and paged list endpoints"""
+    def setUp(self):
+        """Create more states than a batch holds"""
+        self.states = [State(name="State {}".format(i)) for i in range(8)]
+        for state in self.states:
+            models.storage.new(state)
+        models.storage.save()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Delete the states created"""
+        for state in self.states:
+            models.storage.delete(state)
+        models.storage.save()
+
+    def expected(self):
+        """returns the body jsonify gives for every state in id order"""
+        states = sorted(models.storage.all(State).values(),
+                        key=lambda state: state.id)
+        with app.app_context():
+            return jsonify([state.to_dict() for state in states]).get_data()
+
+    def test_streams_in_id_order(self):
+        """Test that a list longer than a batch streams valid JSON in id
+        order, formatted like jsonify"""
+        with mock.patch.object(pages, "batch", 3):
+            response = self.client.get("/api/v1/states")
+            chunks = list(response.response)
+        count = len(models.storage.all(State))
+        self.assertEqual(len(chunks), 2 + (count + 2) // 3)
+        body = b"".join(chunks)
+        self.assertEqual(body, self.expected())
+        ids = [state["id"] for state in json.loads(body)]
+        self.assertEqual(ids, sorted(state.id for state in
+                                     models.storage.all(State).values()))
+
+    def test_pages_match_stream(self):
+        """Test that a page holding everything has the streamed body"""
+        response = self.client.get("/api/v1/states?limit=500")
+        self.assertEqual(response.get_data(), self.expected())
+
+    def test_invalid_limit(self):
+        """Test that a limit below 1 or above a batch is rejected"""
+        for limit in ["0", "501", "x"]:
+            response = self.client.get("/api/v1/states?limit=" + limit)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json(), {"error": "Invalid limit"})
+        with mock.patch.object(pages, "batch", 3):
+            response = self.client.get("/api/v1/states?limit=4")
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_walks_every_state(self):
+        """Test that following the next links visits every state once"""
+        url = "/api/v1/states?limit=3"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            ids.extend(state["id"] for state in response.get_json())
+            link = response.headers.get("Link")
+            url = link[1:link.index(">")] if link else None
+        self.assertEqual(ids, sorted(state.id for state in
+                                     models.storage.all(State).values()))
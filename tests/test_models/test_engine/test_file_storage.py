@@ -17,6 +17,7 @@ from models.user import User
 import json
 import os
 import pep8
+import time
 import unittest
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
@@ -113,3 +114,587 @@ class TestFileStorage(unittest.TestCase):
         with open("file.json", "r") as f:
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_with_class(self):
+        """Test that all filters by class name or class"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State()
+        city = City()
+        storage.new(state)
+        storage.new(city)
+        key = "State." + state.id
+        self.assertEqual(storage.all(State), {key: state})
+        self.assertEqual(storage.all("State"), {key: state})
+        self.assertEqual(storage.all(State, load=("cities",)), {key: state})
+        storage.delete(state)
+        self.assertEqual(storage.all(State), {})
+        self.assertEqual(len(storage.all(City)), 1)
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_with_class_replaced_objects(self):
+        """Test that all(cls) follows a replaced __objects dictionary"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        state = State()
+        FileStorage._FileStorage__objects = {"State." + state.id: state}
+        self.assertEqual(list(storage.all(State).values()), [state])
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get(self):
+        """Test that get returns the object by class and id"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State()
+        storage.new(state)
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertIs(storage.get("State", state.id), state)
+        self.assertIsNone(storage.get("City", state.id))
+        self.assertIsNone(storage.get("State", "nope"))
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_many(self):
+        """Test that get_many returns the objects found, in ids order"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        first = State()
+        second = State()
+        storage.new(first)
+        storage.new(second)
+        self.assertEqual(storage.get_many(State, [second.id, "nope",
+                                                  first.id, second.id]),
+                         [second, first])
+        self.assertEqual(storage.get_many("City", [first.id]), [])
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Test that page walks the objects in id order, after a cursor"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        states = [State() for i in range(5)]
+        for state in states:
+            storage.new(state)
+        ids = sorted(state.id for state in states)
+        self.assertEqual([s.id for s in storage.page(State, 2)], ids[:2])
+        self.assertEqual([s.id for s in storage.page("State", 2, ids[1])],
+                         ids[2:4])
+        self.assertEqual(storage.page(State, 2, ids[4]), [])
+        extra = State()
+        storage.new(extra)
+        storage.delete(states[0])
+        ids.remove(states[0].id)
+        ids = sorted(ids + [extra.id])
+        self.assertEqual([s.id for s in storage.page(State, 10)], ids)
+        city = City(state_id=ids[0])
+        storage.new(city)
+        self.assertEqual(storage.page(City, 10, None, "state_id", ids[0]),
+                         [city])
+        city.state_id = ids[1]
+        self.assertEqual(storage.page(City, 10, None, "state_id", ids[0]),
+                         [])
+        self.assertEqual(storage.page(City, 10, None, "state_id", ids[1]),
+                         [city])
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_count(self):
+        """Test that count returns the number of objects per class"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        for i in range(3):
+            storage.new(State())
+        storage.new(City())
+        self.assertEqual(storage.count(), 4)
+        self.assertEqual(storage.count(State), 3)
+        self.assertEqual(storage.count("City"), 1)
+        self.assertEqual(storage.count("Review"), 0)
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related(self):
+        """Test that related follows new, delete and attribute changes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        storage.new(state)
+        storage.new(other)
+        storage.new(city)
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        city.state_id = other.id
+        self.assertEqual(storage.related(City, "state_id", state.id), [])
+        self.assertEqual(storage.related("City", "state_id", other.id),
+                         [city])
+        storage.delete(city)
+        self.assertEqual(storage.related(City, "state_id", other.id), [])
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_subscribe(self):
+        """Test that listeners hear about new, changed and deleted objects"""
+        storage = FileStorage()
+        save = (FileStorage._FileStorage__objects,
+                list(FileStorage._FileStorage__listeners))
+        FileStorage._FileStorage__objects = {}
+        events = []
+        storage.subscribe(lambda obj, deleted: events.append((obj, deleted)))
+        storage.all()
+        state = State()
+        storage.new(state)
+        state.name = "Texas"
+        storage.delete(state)
+        self.assertEqual(events, [(None, False), (state, False),
+                                  (state, False), (state, True)])
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__listeners[:]) = save
+
+
+class TestFileStorageJournal(unittest.TestCase):
+    """Test the append-only journal mode of FileStorage"""
+    def setUp(self):
+        """Point FileStorage at an empty journaled file"""
+        self.saved = (FileStorage._FileStorage__objects,
+                      FileStorage._FileStorage__file_path,
+                      FileStorage._FileStorage__journal)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_journal.json"
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__dirty = set()
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restore FileStorage and remove the test files"""
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__file_path,
+         FileStorage._FileStorage__journal) = self.saved
+        FileStorage._FileStorage__dirty = set()
+        for path in ["test_journal.json", "test_journal.json.journal"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_appends_changed_records(self):
+        """Test that save only appends upserts and tombstones"""
+        state = State(name="California")
+        city = City(name="Fremont")
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.storage.delete(city)
+        self.storage.save()
+        self.assertFalse(os.path.exists("test_journal.json"))
+        with open("test_journal.json.journal", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2], {"__class__": "City", "id": city.id,
+                                      "__deleted__": True})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_replays_journal(self):
+        """Test that reload applies the journal on top of the JSON file"""
+        state = State(name="California")
+        city = City(name="Fremont")
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.compact()
+        state.name = "Nevada"
+        self.storage.new(state)
+        self.storage.delete(city)
+        self.storage.save()
+        with open("test_journal.json.journal", "a") as f:
+            f.write('{"__class__": "Sta')
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(list(self.storage.all().keys()),
+                         ["State." + state.id])
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+        self.assertFalse(os.path.exists("test_journal.json.journal"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_compact(self):
+        """Test that compact folds the journal into the JSON file"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.compact()
+        self.assertFalse(os.path.exists("test_journal.json.journal"))
+        with open("test_journal.json", "r") as f:
+            self.assertIn("State." + state.id, json.load(f))
+
+
+class TestFileStorageDirty(unittest.TestCase):
+    """Test that FileStorage only re-serializes changed objects"""
+    def setUp(self):
+        """Point FileStorage at an empty file"""
+        self.saved = (FileStorage._FileStorage__objects,
+                      FileStorage._FileStorage__file_path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_dirty.json"
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restore FileStorage and remove the test file"""
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__file_path) = self.saved
+        if os.path.exists("test_dirty.json"):
+            os.remove("test_dirty.json")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_serializes_dirty_objects(self):
+        """Test that save calls to_dict only on changed objects"""
+        states = [State(name="State {}".format(i)) for i in range(3)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        calls = []
+        to_dict = State.to_dict
+
+        def counting_to_dict(obj):
+            """counts the calls to to_dict"""
+            calls.append(obj)
+            return to_dict(obj)
+        State.to_dict = counting_to_dict
+        try:
+            states[1].name = "Nevada"
+            self.storage.save()
+        finally:
+            State.to_dict = to_dict
+        self.assertEqual(calls, [states[1]])
+        with open("test_dirty.json", "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["State." + states[1].id]["name"], "Nevada")
+        self.assertEqual(len(js), 3)
+
+
+class TestFileStorageWriteBehind(unittest.TestCase):
+    """Test the background flusher of FileStorage"""
+    def setUp(self):
+        """Point FileStorage at an empty file with write-behind enabled"""
+        self.saved = (FileStorage._FileStorage__objects,
+                      FileStorage._FileStorage__file_path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_flush.json"
+        FileStorage._FileStorage__dirty = set()
+        FileStorage._FileStorage__flush_interval = 60
+        FileStorage._FileStorage__flush_dirty = 2
+        FileStorage._FileStorage__max_unflushed = 3
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Stop the flusher, restore FileStorage and remove the test file"""
+        flusher = FileStorage._FileStorage__flusher
+        FileStorage._FileStorage__flush_interval = 0
+        FileStorage._FileStorage__wake.set()
+        if flusher is not None:
+            flusher.join()
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__file_path) = self.saved
+        FileStorage._FileStorage__dirty = set()
+        if os.path.exists("test_flush.json"):
+            os.remove("test_flush.json")
+
+    def saved_keys(self):
+        """returns the keys written to the test file"""
+        if not os.path.exists("test_flush.json"):
+            return set()
+        with open("test_flush.json", "r") as f:
+            return set(json.load(f).keys())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_defers_write(self):
+        """Test that save returns before writing below the threshold"""
+        self.storage.new(State())
+        self.storage.save()
+        self.assertEqual(self.saved_keys(), set())
+        self.storage.flush()
+        self.assertEqual(len(self.saved_keys()), 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_threshold_wakes_flusher(self):
+        """Test that the flusher writes once enough objects are dirty"""
+        for i in range(2):
+            self.storage.new(State())
+        self.storage.save()
+        for i in range(100):
+            if len(self.saved_keys()) == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.saved_keys()), 2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_max_unflushed_writes_synchronously(self):
+        """Test that save writes itself past the unflushed limit"""
+        FileStorage._FileStorage__flush_dirty = 10
+        for i in range(3):
+            self.storage.new(State())
+        self.storage.save()
+        self.assertEqual(len(self.saved_keys()), 3)
+
+
+class TestFileStorageClose(unittest.TestCase):
+    """Test that close only applies changes made to the file by others"""
+    def setUp(self):
+        """Point FileStorage at a saved file holding two states"""
+        self.saved = (FileStorage._FileStorage__objects,
+                      FileStorage._FileStorage__file_path)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_close.json"
+        self.storage = FileStorage()
+        self.states = [State(name="California"), State(name="Nevada")]
+        for state in self.states:
+            self.storage.new(state)
+        self.storage.save()
+
+    def tearDown(self):
+        """Restore FileStorage and remove the test files"""
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__file_path) = self.saved
+        for path in ["test_close.json", "test_close.json.journal"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_unchanged_file(self):
+        """Test that close keeps the objects when the file is unchanged"""
+        self.storage.close()
+        for state in self.states:
+            self.assertIs(self.storage.get(State, state.id), state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_changed_file(self):
+        """Test that close only rebuilds the objects that changed"""
+        with open("test_close.json", "r") as f:
+            js = json.load(f)
+        js["State." + self.states[0].id]["name"] = "Oregon"
+        del js["State." + self.states[1].id]
+        city = City(name="Portland")
+        js["City." + city.id] = city.to_dict()
+        time.sleep(0.01)
+        with open("test_close.json", "w") as f:
+            json.dump(js, f)
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, self.states[0].id).name,
+                         "Oregon")
+        self.assertIsNone(self.storage.get(State, self.states[1].id))
+        self.assertEqual(self.storage.get(City, city.id).name, "Portland")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_keeps_unsaved_changes(self):
+        """Test that close does not undo the changes not saved yet"""
+        self.states[0].name = "Oregon"
+        self.storage.new(self.states[0])
+        self.storage.delete(self.states[1])
+        city = City(name="Portland")
+        with open("test_close.json", "r") as f:
+            js = json.load(f)
+        js["City." + city.id] = city.to_dict()
+        time.sleep(0.01)
+        with open("test_close.json", "w") as f:
+            json.dump(js, f)
+        self.storage.close()
+        self.assertIs(self.storage.get(State, self.states[0].id),
+                      self.states[0])
+        self.assertEqual(self.states[0].name, "Oregon")
+        self.assertIsNone(self.storage.get(State, self.states[1].id))
+        self.assertEqual(self.storage.get(City, city.id).name, "Portland")
+        self.storage.save()
+        with open("test_close.json", "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["State." + self.states[0].id]["name"], "Oregon")
+        self.assertNotIn("State." + self.states[1].id, js)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_replays_new_journal_records(self):
+        """Test that close applies records appended to the journal"""
+        unchanged = self.storage.get(State, self.states[1].id)
+        record = self.states[0].to_dict()
+        record["name"] = "Oregon"
+        with open("test_close.json.journal", "a") as f:
+            f.write(json.dumps(record) + "\n")
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, self.states[0].id).name,
+                         "Oregon")
+        self.assertIs(self.storage.get(State, self.states[1].id), unchanged)
+
+
+class TestFileStorageJSONLines(unittest.TestCase):
+    """Test the JSON Lines format of FileStorage"""
+    def setUp(self):
+        """Point FileStorage at an empty JSON Lines file"""
+        self.saved = (FileStorage._FileStorage__objects,
+                      FileStorage._FileStorage__file_path,
+                      FileStorage._FileStorage__lines)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_lines.jsonl"
+        FileStorage._FileStorage__lines = True
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restore FileStorage and remove the test files"""
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__file_path,
+         FileStorage._FileStorage__lines) = self.saved
+        for path in ["test_lines.jsonl", "test_lines.json"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_and_reload(self):
+        """Test that save writes one object per line and reload reads it"""
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        with open("test_lines.jsonl", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertCountEqual(records, [state.to_dict(), city.to_dict()])
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.get(City, city.id).name, "Fremont")
+        self.assertEqual(len(self.storage.get(State, state.id).cities), 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_converts_json_file(self):
+        """Test that reload converts an existing JSON file"""
+        state = State(name="California")
+        with open("test_lines.json", "w") as f:
+            json.dump({"State." + state.id: state.to_dict()}, f)
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name,
+                         "California")
+        with open("test_lines.jsonl", "r") as f:
+            self.assertEqual(json.loads(f.readline()), state.to_dict())
+
+
+class TestFileStorageShards(unittest.TestCase):
+    """Test the per-class shard files of FileStorage"""
+    def setUp(self):
+        """Point FileStorage at an empty sharded file"""
+        self.saved = (FileStorage._FileStorage__objects,
+                      FileStorage._FileStorage__file_path,
+                      FileStorage._FileStorage__shards,
+                      FileStorage._FileStorage__journal)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "test_shards.json"
+        FileStorage._FileStorage__shards = 1
+        FileStorage._FileStorage__dirty_shards = set()
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restore FileStorage and remove the test files"""
+        (FileStorage._FileStorage__objects,
+         FileStorage._FileStorage__file_path,
+         FileStorage._FileStorage__shards,
+         FileStorage._FileStorage__journal) = self.saved
+        FileStorage._FileStorage__dirty = set()
+        FileStorage._FileStorage__dirty_shards = set()
+        FileStorage._FileStorage__journal_len = 0
+        FileStorage._FileStorage__journal_offset = 0
+        if os.path.exists("test_shards.json.journal"):
+            os.remove("test_shards.json.journal")
+        if os.path.isdir("test_shards.d"):
+            for name in os.listdir("test_shards.d"):
+                os.remove(os.path.join("test_shards.d", name))
+            os.rmdir("test_shards.d")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_writes_changed_shards(self):
+        """Test that save only rewrites the shards of changed classes"""
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.assertEqual(sorted(os.listdir("test_shards.d")),
+                         ["City.json", "State.json"])
+        state_file = os.stat("test_shards.d/State.json")
+        city.name = "Oakland"
+        self.storage.save()
+        self.assertEqual(os.stat("test_shards.d/State.json").st_ino,
+                         state_file.st_ino)
+        with open("test_shards.d/City.json", "r") as f:
+            self.assertEqual(json.load(f)["City." + city.id]["name"],
+                             "Oakland")
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.get(City, city.id).name, "Oakland")
+        self.assertEqual(self.storage.get(State, state.id).name,
+                         "California")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_hash_buckets(self):
+        """Test that objects are spread over hash buckets per class"""
+        FileStorage._FileStorage__shards = 4
+        reviews = [Review(text="Review {}".format(i)) for i in range(20)]
+        for review in reviews:
+            self.storage.new(review)
+        self.storage.save()
+        names = os.listdir("test_shards.d")
+        self.assertTrue(len(names) > 1)
+        for name in names:
+            self.assertRegex(name, r"^Review\.[0-3]\.json$")
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(self.storage.count(Review), 20)
+
+    def restart(self):
+        """Forget everything FileStorage read, as a new process would"""
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fragments = {}
+        FileStorage._FileStorage__stamps = {}
+        FileStorage._FileStorage__dirty = set()
+        FileStorage._FileStorage__dirty_shards = set()
+        self.storage.reload()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_compact_keeps_replayed_journal(self):
+        """Test that compact writes the shards of the journal records
+        another process appended before deleting the journal"""
+        FileStorage._FileStorage__journal = True
+        city = City(name="Fremont")
+        self.storage.new(city)
+        self.storage.compact()
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertEqual(os.listdir("test_shards.d"), ["City.json"])
+        self.restart()
+        self.storage.delete(self.storage.get(City, city.id))
+        self.storage.new(City(name="Oakland"))
+        self.storage.compact()
+        self.assertFalse(os.path.exists("test_shards.json.journal"))
+        self.restart()
+        self.assertEqual(list(self.storage.all(State)), ["State." + state.id])
+        self.assertIsNone(self.storage.get(City, city.id))
+        self.assertEqual(self.storage.count(City), 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_torn_journal(self):
+        """Test that the records before a torn journal tail are kept"""
+        FileStorage._FileStorage__journal = True
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.compact()
+        city = City(name="Fremont", state_id=state.id)
+        self.storage.new(city)
+        self.storage.delete(state)
+        self.storage.save()
+        with open("test_shards.json.journal", "a") as f:
+            f.write('{"__class__": "Sta')
+        self.restart()
+        self.assertFalse(os.path.exists("test_shards.json.journal"))
+        self.restart()
+        self.assertEqual(list(self.storage.all()), ["City." + city.id])
@@ -0,0 +1,425 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.city import City
+from models.state import State
+import os
+import pep8
+import shutil
+from sqlalchemy import inspect as inspect_db, text
+import tempfile
+import unittest
+from unittest import mock
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqs_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1,
+                        "SQLiteStorage class needs a docstring")
+
+    def test_sqs_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqs_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") != 'sqlite',
+                 "not testing sqlite storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    def test_storage_is_sqlite(self):
+        """Test that HBNB_TYPE_STORAGE=sqlite selects SQLiteStorage"""
+        self.assertIs(type(models.storage), SQLiteStorage)
+        self.assertEqual(models.storage_t, 'db')
+
+    def test_get_and_count(self):
+        """Test that saved objects can be fetched and counted"""
+        count = models.storage.count(State)
+        state = State(name="California")
+        state.save()
+        city = City(name="Fremont", state_id=state.id)
+        city.save()
+        self.assertIs(models.storage.get("State", state.id), state)
+        self.assertEqual(models.storage.count(State), count + 1)
+        self.assertEqual(models.storage.count("Nope"), 0)
+        self.assertEqual(state.cities, [city])
+        city.delete()
+        state.delete()
+        models.storage.save()
+        self.assertIsNone(models.storage.get(State, state.id))
+
+    def test_wal_mode(self):
+        """Test that the database runs in write-ahead logging mode"""
+        session = models.storage._DBStorage__session
+        mode = session.execute(text("PRAGMA journal_mode"))
+        self.assertEqual(mode.scalar(), "wal")
+
+    def test_count_uses_counters(self):
+        """Test that warm counters answer count without a query"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        engine = models.storage._DBStorage__engine
+        sqlite_storage.event.listen(engine, "before_cursor_execute", record)
+        try:
+            total = models.storage.count()
+            state = State(name="California")
+            state.save()
+            del statements[:]
+            self.assertEqual(models.storage.count(State),
+                             models.storage.count("State"))
+            self.assertEqual(models.storage.count(), total + 1)
+            self.assertEqual(statements, [])
+            state.delete()
+            models.storage.save()
+            self.assertEqual(models.storage.count(), total)
+        finally:
+            sqlite_storage.event.remove(engine, "before_cursor_execute",
+                                        record)
+
+    def test_count_sees_other_writers(self):
+        """Test that close lets count see the rows other storages wrote
+        once the counters are due for a reload"""
+        count = models.storage.count(State)
+        other = SQLiteStorage()
+        other.reload()
+        state = State(name="Nevada")
+        other.new(state)
+        other.save()
+        self.assertEqual(models.storage.count(State), count)
+        with mock.patch.object(models.storage, "_DBStorage__resync", 3600):
+            models.storage.close()
+            self.assertEqual(models.storage.count(State), count)
+        with mock.patch.object(models.storage, "_DBStorage__resync", 0):
+            models.storage.close()
+            self.assertEqual(models.storage.count(State), count + 1)
+            other.delete(state)
+            other.save()
+            other.close()
+            models.storage.close()
+            self.assertEqual(models.storage.count(State), count)
+
+    def test_counters_stay_warm_across_close(self):
+        """Test that close keeps the counters until they are due"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        models.storage.count()
+        engine = models.storage._DBStorage__engine
+        sqlite_storage.event.listen(engine, "before_cursor_execute", record)
+        try:
+            with mock.patch.object(models.storage, "_DBStorage__resync",
+                                   3600):
+                models.storage.close()
+                models.storage.count()
+        finally:
+            sqlite_storage.event.remove(engine, "before_cursor_execute",
+                                        record)
+        self.assertEqual(statements, [])
+
+    def test_close_resets_listeners_on_other_writes(self):
+        """Test that close tells the listeners to start over only when
+        the tables changed"""
+        calls = []
+
+        def record(obj, deleted):
+            """records the objects the listeners are told about"""
+            calls.append(obj)
+        listeners = models.storage._DBStorage__listeners
+        saved = listeners[:]
+        other = SQLiteStorage()
+        state = State(name="Nevada")
+        try:
+            with mock.patch.object(models.storage, "_DBStorage__resync", 0):
+                models.storage.close()
+                listeners[:] = []
+                other.reload()
+                other.new(state)
+                other.save()
+                models.storage.subscribe(record)
+                models.storage.close()
+                self.assertEqual(calls, [None])
+                models.storage.close()
+                self.assertEqual(calls, [None])
+        finally:
+            listeners[:] = []
+            other.delete(state)
+            other.save()
+            other.close()
+            listeners[:] = saved
+
+    def test_cold_count_is_one_query(self):
+        """Test that cold counters are loaded with a single query"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        models.storage._DBStorage__counts.clear()
+        engine = models.storage._DBStorage__engine
+        sqlite_storage.event.listen(engine, "before_cursor_execute", record)
+        try:
+            models.storage.count()
+            models.storage.count(City)
+        finally:
+            sqlite_storage.event.remove(engine, "before_cursor_execute",
+                                        record)
+        self.assertEqual(len(statements), 1)
+
+    def test_search_places_is_one_query(self):
+        """Test that search_places filters in a single query"""
+        from models.amenity import Amenity
+        from models.place import Place
+        from models.user import User
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        user = User(email="search@hbnb.io", password="pwd")
+        state = State(name="California")
+        city = City(name="Fremont", state_id=state.id)
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        both = Place(name="Both", city_id=city.id, user_id=user.id,
+                     price_by_night=120)
+        both.amenities.extend([wifi, pool])
+        wifi_only = Place(name="Wifi", city_id=city.id, user_id=user.id)
+        wifi_only.amenities.append(wifi)
+        for obj in [user, state, city, wifi, pool, both, wifi_only]:
+            models.storage.new(obj)
+        models.storage.save()
+        engine = models.storage._DBStorage__engine
+        sqlite_storage.event.listen(engine, "before_cursor_execute", record)
+        try:
+            found = models.storage.search_places([state.id], [],
+                                                 [wifi.id, pool.id])
+        finally:
+            sqlite_storage.event.remove(engine, "before_cursor_execute",
+                                        record)
+        self.assertEqual(found, [both])
+        self.assertEqual(len(statements), 1)
+        found = models.storage.search_places([], [city.id], [wifi.id])
+        self.assertEqual(set(found), {both, wifi_only})
+        found = models.storage.search_places([], [city.id], [],
+                                             {"price_by_night": (100, None)})
+        self.assertEqual(found, [both])
+        for obj in [both, wifi_only, wifi, pool, city, state, user]:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def test_subscribe(self):
+        """Test that listeners hear about objects once they are committed"""
+        events = []
+
+        def listen(obj, deleted):
+            """records the changes"""
+            events.append((obj, deleted))
+        listeners = models.storage._DBStorage__listeners
+        listeners.append(listen)
+        try:
+            state = State(name="California")
+            models.storage.new(state)
+            self.assertEqual(events, [])
+            models.storage.save()
+            self.assertEqual(events, [(state, False)])
+            state.delete()
+            models.storage.save()
+            self.assertEqual(events, [(state, False), (state, True)])
+        finally:
+            listeners.remove(listen)
+
+    def test_all_eager_loads(self):
+        """Test that all() loads the named relationships up front"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        states = [State(name="State {}".format(i)) for i in range(5)]
+        for state in states:
+            models.storage.new(state)
+            models.storage.new(City(name="City", state_id=state.id))
+        models.storage.save()
+        models.storage.close()
+        engine = models.storage._DBStorage__engine
+        sqlite_storage.event.listen(engine, "before_cursor_execute", record)
+        try:
+            loaded = models.storage.all(State, load=("cities.places",
+                                                     "nope"))
+            for state in loaded.values():
+                for city in state.cities:
+                    city.places
+        finally:
+            sqlite_storage.event.remove(engine, "before_cursor_execute",
+                                        record)
+        self.assertEqual(len(statements), 3)
+        for state in states:
+            for city in loaded["State." + state.id].cities:
+                models.storage.delete(city)
+            models.storage.delete(loaded["State." + state.id])
+        models.storage.save()
+
+    def test_pool_stats(self):
+        """Test that pool_stats counts the connection checkouts"""
+        before = models.storage.pool_stats()
+        with models.storage._DBStorage__engine.connect():
+            during = models.storage.pool_stats()
+        self.assertEqual(during["checkouts"], before["checkouts"] + 1)
+        self.assertEqual(during["checked_out"], before["checked_out"] + 1)
+        self.assertEqual(during["timeouts"], 0)
+        self.assertGreaterEqual(during["wait_seconds"],
+                                before["wait_seconds"])
+
+    def test_replica_routing(self):
+        """Test that reads go to the replica until the session writes"""
+        saved = dict(os.environ)
+        directory = tempfile.mkdtemp()
+        os.environ["HBNB_SQLITE_DB"] = os.path.join(directory, "primary.db")
+        os.environ["HBNB_SQLITE_REPLICAS"] = os.path.join(directory,
+                                                          "replica.db")
+        try:
+            storage = SQLiteStorage()
+            storage.reload()
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+        self.assertTrue(storage.routes_reads())
+        self.assertFalse(models.storage.routes_reads())
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        self.assertIs(storage.get(State, state.id), state)
+        storage.close()
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertEqual(storage.count(State), 0)
+        storage.new(State(name="Nevada"))
+        self.assertIsNotNone(storage.get(State, state.id))
+        storage.close()
+        stats = storage.pool_stats()
+        self.assertGreater(stats["replicas"][0]["checkouts"], 0)
+        shutil.rmtree(directory)
+
+    def test_migrate_creates_missing_indexes(self):
+        """Test that migrate adds the declared indexes to old tables"""
+        engine = models.storage._DBStorage__engine
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_places_city_id_id"))
+        self.assertNotIn("ix_places_city_id_id", [
+            index["name"] for index in inspect_db(engine).get_indexes(
+                "places")])
+        models.storage.migrate()
+        names = [index["name"]
+                 for table in ("cities", "places", "reviews", "users",
+                               "place_amenity")
+                 for index in inspect_db(engine).get_indexes(table)]
+        for name in ["ix_cities_state_id", "ix_places_city_id_id",
+                     "ix_places_user_id", "ix_reviews_place_id_id",
+                     "ix_reviews_user_id", "ix_users_email",
+                     "ix_place_amenity_amenity_id_place_id"]:
+            self.assertIn(name, names)
+
+    def test_get_many(self):
+        """Test that get_many queries once, only for unknown objects"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            """records the statements sent to the database"""
+            statements.append(statement)
+        states = [State(name="State {}".format(i)) for i in range(3)]
+        for state in states:
+            models.storage.new(state)
+        models.storage.save()
+        engine = models.storage._DBStorage__engine
+        sqlite_storage.event.listen(engine, "before_cursor_execute", record)
+        try:
+            ids = [state.id for state in reversed(states)]
+            self.assertEqual(models.storage.get_many(State, ids + ["nope"]),
+                             list(reversed(states)))
+            self.assertIs(models.storage.get(State, states[0].id),
+                          states[0])
+            self.assertEqual(len(statements), 1)
+            models.storage.close()
+            del statements[:]
+            found = models.storage.get_many("State", ids)
+            self.assertEqual([state.id for state in found], ids)
+            self.assertEqual(len(statements), 1)
+        finally:
+            sqlite_storage.event.remove(engine, "before_cursor_execute",
+                                        record)
+        for state in found:
+            models.storage.delete(state)
+        models.storage.save()
+
+    def test_page(self):
+        """Test that page seeks the objects in id order, after a cursor"""
+        state = State(name="Paged")
+        models.storage.new(state)
+        cities = [City(name="City {}".format(i), state_id=state.id)
+                  for i in range(5)]
+        for city in cities:
+            models.storage.new(city)
+        models.storage.save()
+        ids = sorted(city.id for city in cities)
+        pages = [models.storage.page(City, 2, None, "state_id", state.id)]
+        while pages[-1]:
+            pages.append(models.storage.page(City, 2, pages[-1][-1].id,
+                                             "state_id", state.id))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1, 0])
+        self.assertEqual([city.id for page in pages for city in page], ids)
+        self.assertIn(state, models.storage.page("State", 1000))
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as connection:
+            plan = connection.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM places WHERE city_id = 'a'"
+                " AND id > 'b' ORDER BY id LIMIT 2")).fetchall()
+        self.assertIn("ix_places_city_id_id", str(plan))
+        self.assertNotIn("TEMP B-TREE", str(plan))
+        models.storage.delete(state)
+        for city in cities:
+            models.storage.delete(city)
+        models.storage.save()